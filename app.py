@@ -8,7 +8,10 @@ import base64
 import io
 import tempfile
 import os
+import sys
 import json
+import html
+import hashlib
 
 # Try to import optional dependencies
 try:
@@ -27,6 +30,49 @@ try:
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
+# Process-wide Granite model shared by all browser sessions, loaded through the
+# backend's loader (backend/app/model_registry.py). Without the backend package
+# on hand, each session falls back to loading its own copy. The financial entity
+# extractor and rule-based answers are plain Python and always come from the
+# backend package.
+# Streamlit re-runs this script on every interaction, so only add the path once
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+try:
+    from app.model_registry import registry as _backend_model_registry
+except Exception:
+    _backend_model_registry = None
+from app.financial_entities import extract_financial_context as extract_entities, context_summary
+from app import rule_responses
+
+
+@st.cache_resource
+def get_model_registry():
+    """The shared model registry; st.cache_resource keeps one instance per server process."""
+    return _backend_model_registry
+
+# Backend-client mode: with FINANCE_BACKEND_URL set (e.g. http://localhost:8000),
+# chats go to the FastAPI backend's /api/chat or /api/chat/stream and this
+# process never loads the model, so any number of Streamlit servers can share
+# one backend inference worker.
+FINANCE_BACKEND_URL = os.getenv("FINANCE_BACKEND_URL", "").rstrip("/")
+FINANCE_BACKEND_STREAM = os.getenv("FINANCE_BACKEND_STREAM", "1").lower() not in ("0", "false", "no")
+FINANCE_BACKEND_TIMEOUT = float(os.getenv("FINANCE_BACKEND_TIMEOUT", "120"))
+
+
+@st.cache_resource
+def get_backend_session():
+    """One pooled HTTP session per server process for calls to the backend."""
+    return requests.Session()
+
+# Chat pages render only the last CHAT_HISTORY_WINDOW messages ("Load earlier"
+# shows another window), and a conversation keeps at most
+# CHAT_HISTORY_MAX_MESSAGES messages in session state.
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "20"))
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "200"))
+CHAT_RENDER_CACHE_ENTRIES = int(os.getenv("CHAT_RENDER_CACHE_ENTRIES", "5000"))
+
 # Removed voice functionality imports
 
 # Speech-to-Speech Configuration - WORKING SETUP
@@ -558,6 +604,8 @@ if 'current_page' not in st.session_state:
     st.session_state.current_page = 'home'
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'chat_window' not in st.session_state:
+    st.session_state.chat_window = CHAT_HISTORY_WINDOW
 if 'model_loaded' not in st.session_state:
     st.session_state.model_loaded = False
 if 'tokenizer' not in st.session_state:
@@ -580,8 +628,28 @@ if 'auto_submit_voice' not in st.session_state:
     st.session_state.auto_submit_voice = False
 # Removed voice-related session state
 
+def get_granite():
+    """(tokenizer, model) for this session: the shared pair, or the session's own copy."""
+    registry = get_model_registry()
+    if registry is not None:
+        return registry.tokenizer, registry.model
+    return st.session_state.tokenizer, st.session_state.model
+
 def load_model_silently():
     """Load the IBM Granite model silently in background"""
+    if FINANCE_BACKEND_URL:
+        return False  # the backend owns the model
+    registry = get_model_registry()
+    if registry is not None:
+        # One lease per browser session; it is released when the session state is dropped
+        lease = st.session_state.get('model_lease')
+        if lease is None or lease.released:
+            st.session_state.model_lease = registry.acquire()
+        elif not registry.loaded:
+            registry.load()  # after an explicit unload, or retrying a failed load
+        st.session_state.model_loaded = registry.loaded
+        return st.session_state.model_loaded
+
     if not TRANSFORMERS_AVAILABLE or st.session_state.model_loaded:
         return st.session_state.model_loaded
 
@@ -650,10 +718,22 @@ def create_new_session():
 
     st.session_state.chat_sessions[session_id] = session_data
     st.session_state.current_session_id = session_id
-    st.session_state.chat_history = []
+    set_chat_history()
 
     return session_id
 
+def set_chat_history(messages=()):
+    """Replace the current chat (new chat, loaded session) and show it from the default window"""
+    st.session_state.chat_history = list(messages)
+    st.session_state.chat_window = CHAT_HISTORY_WINDOW
+
+def add_chat_message(role, content):
+    """Append a message to the current chat, dropping the oldest beyond CHAT_HISTORY_MAX_MESSAGES"""
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+    st.session_state.chat_history.append({"role": role, "content": content, "digest": digest})
+    if len(st.session_state.chat_history) > CHAT_HISTORY_MAX_MESSAGES:
+        del st.session_state.chat_history[:-CHAT_HISTORY_MAX_MESSAGES]
+
 def save_current_session():
     """Save current chat to session history"""
     if st.session_state.current_session_id and st.session_state.chat_history:
@@ -672,7 +752,7 @@ def load_session(session_id):
     if session_id in st.session_state.chat_sessions:
         session_data = st.session_state.chat_sessions[session_id]
         st.session_state.current_session_id = session_id
-        st.session_state.chat_history = session_data['chat_history'].copy()
+        set_chat_history(session_data['chat_history'])
         st.session_state.user_mode = session_data['mode']
         return True
     return False
@@ -683,7 +763,7 @@ def delete_session(session_id):
         del st.session_state.chat_sessions[session_id]
         if st.session_state.current_session_id == session_id:
             st.session_state.current_session_id = None
-            st.session_state.chat_history = []
+            set_chat_history()
 
 # Voice functionality
 # Working Speech-to-Speech Functions
@@ -1235,39 +1315,8 @@ def create_elevenlabs_style_voice_interface(mode="student"):
 
 def extract_financial_context(user_input):
     """Extract financial context from user input for better responses"""
-    context = {}
-
-    # Extract amounts
-    amounts = re.findall(r'\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)', user_input.lower())
-    if amounts:
-        context['amounts'] = [float(amt.replace(',', '')) for amt in amounts]
-
-    # Extract time periods
-    time_patterns = {
-        'months': r'(\d+)\s*months?',
-        'years': r'(\d+)\s*years?',
-        'weeks': r'(\d+)\s*weeks?'
-    }
-    for period, pattern in time_patterns.items():
-        matches = re.findall(pattern, user_input.lower())
-        if matches:
-            context[period] = [int(m) for m in matches]
-
-    # Extract financial keywords
-    financial_keywords = {
-        'debt_types': ['student loan', 'credit card', 'mortgage', 'car loan', 'personal loan'],
-        'investment_types': ['stocks', 'bonds', '401k', 'ira', 'roth', 'mutual fund', 'etf'],
-        'account_types': ['checking', 'savings', 'high-yield', 'money market'],
-        'goals': ['retirement', 'house', 'car', 'vacation', 'wedding', 'education'],
-        'life_stage': ['student', 'graduate', 'married', 'single', 'parent', 'retired']
-    }
-
-    for category, keywords in financial_keywords.items():
-        found = [kw for kw in keywords if kw in user_input.lower()]
-        if found:
-            context[category] = found
-
-    return context
+    # One compiled single-pass matcher, shared with the backend prompt builder
+    return extract_entities(user_input)
 
 def get_mode_specific_context(mode):
     """Get context specific to user mode"""
@@ -1335,17 +1384,9 @@ Opportunities: {mode_context['opportunities']}.
 """
 
     # Add specific context based on extracted information
-    if financial_context.get('amounts'):
-        amounts = financial_context['amounts']
-        base_prompt += f"Amounts mentioned: ${', $'.join(map(str, amounts))}. "
-
-    if financial_context.get('debt_types'):
-        debt_types = ', '.join(financial_context['debt_types'])
-        base_prompt += f"Focus on {debt_types} management. "
-
-    if financial_context.get('investment_types'):
-        inv_types = ', '.join(financial_context['investment_types'])
-        base_prompt += f"Provide {st.session_state.user_mode}-appropriate guidance on {inv_types}. "
+    details = context_summary(financial_context, st.session_state.user_mode)
+    if details:
+        base_prompt += details + " "
 
     # Add scenario context
     if scenario_context:
@@ -1378,6 +1419,13 @@ Response:"""
 
 def generate_response(user_input, scenario_context=""):
     """Generate optimized financial response using IBM Granite model"""
+    if FINANCE_BACKEND_URL:
+        return generate_backend_response(user_input, scenario_context)
+
+    tokenizer, model = get_granite()
+    if model is None:
+        # Never loaded, or the shared model was unloaded; the next chat reloads it
+        st.session_state.model_loaded = False
     if not st.session_state.model_loaded or not TRANSFORMERS_AVAILABLE:
         return generate_fallback_response(user_input, scenario_context)
 
@@ -1390,7 +1438,7 @@ def generate_response(user_input, scenario_context=""):
         financial_prompt = build_financial_prompt(user_input, scenario_context, financial_context)
 
         # Optimized tokenization for financial content
-        inputs = st.session_state.tokenizer(
+        inputs = tokenizer(
             financial_prompt,
             return_tensors="pt",
             truncation=True,
@@ -1400,20 +1448,20 @@ def generate_response(user_input, scenario_context=""):
         )
 
         # Move inputs to same device as model
-        device = next(st.session_state.model.parameters()).device
+        device = next(model.parameters()).device
         inputs = {k: v.to(device) for k, v in inputs.items()}
 
         # Optimized generation parameters for financial advice
         with torch.no_grad():
-            outputs = st.session_state.model.generate(
+            outputs = model.generate(
                 input_ids=inputs['input_ids'],
                 attention_mask=inputs['attention_mask'],
                 max_new_tokens=120,  # Increased for detailed financial advice
                 temperature=0.5,     # Lower for more consistent financial advice
                 do_sample=True,
                 top_p=0.9,          # Nucleus sampling for better quality
-                pad_token_id=st.session_state.tokenizer.pad_token_id,
-                eos_token_id=st.session_state.tokenizer.eos_token_id,
+                pad_token_id=tokenizer.pad_token_id,
+                eos_token_id=tokenizer.eos_token_id,
                 repetition_penalty=1.15,  # Higher to avoid repetition
                 no_repeat_ngram_size=3,
                 use_cache=True,
@@ -1421,7 +1469,7 @@ def generate_response(user_input, scenario_context=""):
             )
 
         # Decode only the new tokens
-        response = st.session_state.tokenizer.decode(
+        response = tokenizer.decode(
             outputs[0][inputs['input_ids'].shape[-1]:],
             skip_special_tokens=True
         )
@@ -1429,7 +1477,7 @@ def generate_response(user_input, scenario_context=""):
         # Clean and format the response
         response = response.strip()
         if not response or len(response) < 15:
-            return generate_fallback_response(user_input, scenario_context)
+            return generate_fallback_response(user_input, scenario_context, financial_context)
 
         # Format the response with financial context
         formatted_response = format_financial_response(response, financial_context)
@@ -1437,7 +1485,71 @@ def generate_response(user_input, scenario_context=""):
 
     except Exception as e:
         # Fall back to enhanced manual responses
-        return generate_fallback_response(user_input, scenario_context)
+        return generate_fallback_response(user_input, scenario_context, financial_context)
+
+def iter_backend_events(response):
+    """Parse a server-sent event stream into (event, data) pairs"""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+    if data:
+        yield event, json.loads("\n".join(data))
+
+def stream_backend_response(payload, placeholder):
+    """Stream /api/chat/stream into placeholder; returns (text, meta)"""
+    parts, meta = [], {}
+    url = f"{FINANCE_BACKEND_URL}/api/chat/stream"
+    with get_backend_session().post(url, json=payload, stream=True, timeout=FINANCE_BACKEND_TIMEOUT) as response:
+        response.raise_for_status()
+        for event, data in iter_backend_events(response):
+            if event == "error":
+                raise RuntimeError(data.get("detail", "stream error"))
+            if event == "done":
+                meta = data
+                break
+            parts.append(data.get("token", ""))
+            placeholder.markdown("".join(parts) + " ▌")
+    placeholder.empty()
+    return "".join(parts), meta
+
+def generate_backend_response(user_input, scenario_context=""):
+    """Generate a response through the FastAPI backend (FINANCE_BACKEND_URL)"""
+    financial_context = extract_financial_context(user_input)
+    st.session_state.financial_context = financial_context
+    payload = {
+        "user_input": user_input,
+        "scenario_context": scenario_context,
+        "user_mode": st.session_state.user_mode,
+    }
+
+    try:
+        if FINANCE_BACKEND_STREAM:
+            text, meta = stream_backend_response(payload, st.empty())
+        else:
+            response = get_backend_session().post(f"{FINANCE_BACKEND_URL}/api/chat", json=payload, timeout=FINANCE_BACKEND_TIMEOUT)
+            response.raise_for_status()
+            meta = response.json()
+            text = meta.pop("response", "")
+    except Exception as e:
+        # Backend unreachable or failed mid-stream
+        return generate_fallback_response(user_input, scenario_context, financial_context)
+
+    text = text.strip()
+    if not text:
+        return generate_fallback_response(user_input, scenario_context, financial_context)
+    if meta.get("provider") == "granite":
+        # Same presentation as in-process Granite answers
+        return format_financial_response(text, financial_context)
+    return text
 
 def format_financial_response(response, financial_context):
     """Format AI response with enhanced financial structure"""
@@ -1584,232 +1696,22 @@ def format_ai_response(response):
     """Legacy format function - redirects to enhanced version"""
     return format_financial_response(response, {})
 
-def generate_fallback_response(user_input, scenario_context=""):
+def generate_fallback_response(user_input, scenario_context="", financial_context=None):
     """Generate enhanced fallback responses with mode-specific financial intelligence"""
-    # Extract context for smarter responses
-    financial_context = extract_financial_context(user_input)
-
-    # Mode-specific financial responses
-    if st.session_state.user_mode == 'student':
-        fallback_responses = get_student_responses()
-    else:
-        fallback_responses = get_professional_responses()
-
-def get_student_responses():
-    """Student-specific financial responses"""
-    return {
-        "student loan": {
-            "title": "Student Loan Survival Guide",
-            "advice": "Smart loan management while in school and after graduation can save you thousands.",
-            "points": [
-                "Apply for income-driven repayment (IDR) plans - payments can be $0 if income is low",
-                "Make interest-only payments while in school to prevent capitalization",
-                "Use any extra money (tax refunds, gifts) for high-interest loan principal",
-                "Research loan forgiveness programs for your career field (teaching, public service, healthcare)",
-                "Avoid private loan refinancing until you have stable income and good credit",
-                "Set up autopay for 0.25% interest rate reduction on federal loans"
-            ]
-        },
-        "emergency fund": {
-            "title": "Student Emergency Fund Starter",
-            "advice": "Even $500 can prevent you from going into debt during emergencies.",
-            "points": [
-                "Start with $500 goal - achievable with part-time work or side gigs",
-                "Save loose change and small bills in a jar - can add up to $200+ yearly",
-                "Use student bank accounts with no fees and mobile deposit features",
-                "Automate $10-25 weekly transfers from checking to savings",
-                "Keep emergency fund separate from spending money to avoid temptation",
-                "True emergencies: car repairs, medical bills, unexpected school costs"
-            ]
-        },
-        "budget": {
-            "title": "Student Budget Mastery",
-            "advice": "Track every dollar to maximize your limited income and avoid debt.",
-            "points": [
-                "Use free apps like Mint, YNAB (free for students), or simple spreadsheets",
-                "Follow 50/30/20 rule: 50% needs, 30% wants, 20% savings/debt payments",
-                "Track textbook costs and look for rentals, used books, or digital versions",
-                "Budget for irregular expenses: spring break, summer without income",
-                "Take advantage of student discounts (Amazon Prime, Spotify, software)",
-                "Review weekly - student budgets change with semesters and jobs"
-            ]
-        },
-        "spending": {
-            "title": "Expense Optimization Framework",
-            "advice": "Strategic spending cuts can free up 15-30% of your income for savings.",
-            "points": [
-                "Audit all subscriptions and cancel unused services (average household has $273/month)",
-                "Implement the 24-48 hour rule for purchases over $100 to reduce impulse buying",
-                "Use the envelope method or spending apps to track discretionary categories",
-                "Negotiate bills (insurance, phone, internet) annually - can save $500-1000/year",
-                "Cook at home more often - meal planning can save $200-400/month per person",
-                "Consider generic brands and bulk buying for 20-40% savings on groceries"
-            ]
-        },
-        "save": {
-            "title": "Compound Savings Acceleration",
-            "advice": "Consistent saving with compound growth creates exponential wealth building.",
-            "points": [
-                "Automate savings immediately after payday using the 'pay yourself first' principle",
-                "Start with 1% of income, increase by 1% every 6 months until reaching 20%",
-                "Use high-yield savings (4-5% APY) for short-term goals, investments for long-term",
-                "Save windfalls (tax refunds, bonuses) - can accelerate goals by years",
-                "Set specific SMART goals: $10,000 emergency fund by December 2025",
-                "Track net worth monthly to visualize progress and stay motivated"
-            ]
-        },
-        "stress": {
-            "title": "Financial Wellness Recovery Plan",
-            "advice": "Financial stress affects 72% of Americans - you're not alone and it's manageable.",
-            "points": [
-                "Start with a simple budget to regain control - even basic tracking reduces stress",
-                "Focus on one financial goal at a time to avoid overwhelm",
-                "Build a $500 starter emergency fund first for immediate peace of mind",
-                "Consider free financial counseling through NFCC (National Foundation for Credit Counseling)",
-                "Practice financial self-care: celebrate small wins and progress milestones",
-                "Remember: financial setbacks are temporary, but good habits create lasting change"
-            ]
-        },
-        "investment": {
-            "title": "Investment Fundamentals for Beginners",
-            "advice": "Time in market beats timing the market - start investing early and consistently.",
-            "points": [
-                "Begin with employer 401(k) match (100% return) before other investments",
-                "Use low-cost index funds (expense ratios under 0.1%) for broad market exposure",
-                "Follow age-based allocation: (100 - your age)% in stocks, rest in bonds",
-                "Invest consistently regardless of market conditions (dollar-cost averaging)",
-                "Prioritize tax-advantaged accounts: 401(k), IRA, HSA before taxable accounts",
-                "Rebalance annually to maintain target allocation and capture gains"
-            ]
-        },
-        "retirement": {
-            "title": "Retirement Planning Roadmap",
-            "advice": "Starting early gives you the power of compound interest over decades.",
-            "points": [
-                "Aim to save 10-15% of income for retirement starting in your 20s",
-                "Use the 4% rule: need 25x annual expenses saved for retirement",
-                "Maximize employer match first, then IRA, then additional 401(k) contributions",
-                "Consider Roth vs Traditional based on current vs expected future tax rates",
-                "Increase contributions by 1% annually or with each raise",
-                "Review and adjust strategy every 5 years or with major life changes"
-            ]
-        }
-    }
-
-def get_professional_responses():
-    """Professional-specific financial responses"""
-    return {
-        "student loan": {
-            "title": "Professional Loan Optimization Strategy",
-            "advice": "Strategic loan management and tax optimization can save significant money.",
-            "points": [
-                "Evaluate refinancing options with rates as low as 3-4% for excellent credit",
-                "Consider tax deductibility of student loan interest (up to $2,500 annually)",
-                "Implement avalanche method: pay minimums on all, extra on highest rate",
-                "Explore employer student loan repayment benefits (up to $5,250 tax-free)",
-                "Balance loan payoff vs investment returns - invest if market returns > loan rate",
-                "Consider PSLF only if committed to 10+ years of qualifying employment"
-            ]
-        },
-        "emergency fund": {
-            "title": "Professional Emergency Fund Strategy",
-            "advice": "Optimize emergency fund placement for maximum returns while maintaining liquidity.",
-            "points": [
-                "Target 6 months of expenses for professionals (higher than 3-month minimum)",
-                "Use high-yield savings accounts earning 4-5% APY for immediate access",
-                "Consider laddered CDs for portion of emergency fund to maximize returns",
-                "Automate transfers of 10-15% of gross income until fully funded",
-                "Keep emergency fund separate from investment accounts to avoid market risk",
-                "Review annually and adjust for lifestyle inflation and income changes"
-            ]
-        },
-        "budget": {
-            "title": "Professional Wealth Building Budget",
-            "advice": "Optimize cash flow for maximum wealth accumulation and tax efficiency.",
-            "points": [
-                "Implement zero-based budgeting with focus on wealth building categories",
-                "Maximize tax-advantaged accounts: 401(k), IRA, HSA before taxable investing",
-                "Track net worth monthly, not just cash flow - focus on asset accumulation",
-                "Automate investments and bill payments to reduce decision fatigue",
-                "Budget for professional development, networking, and career advancement",
-                "Review quarterly with focus on optimizing tax efficiency and investment allocation"
-            ]
-        },
-        "investment": {
-            "title": "Professional Investment Portfolio Strategy",
-            "advice": "Build diversified, tax-efficient portfolio aligned with professional income growth.",
-            "points": [
-                "Maximize employer 401(k) match first - guaranteed 100% return on investment",
-                "Use low-cost index funds with expense ratios under 0.1% for core holdings",
-                "Implement tax-loss harvesting in taxable accounts to minimize tax burden",
-                "Consider backdoor Roth IRA if income exceeds direct contribution limits",
-                "Rebalance annually or when allocations drift 5% from target",
-                "Evaluate need for financial advisor when portfolio exceeds $500K-1M"
-            ]
-        },
-        "retirement": {
-            "title": "Executive Retirement Planning",
-            "advice": "Maximize retirement savings with sophisticated strategies and tax optimization.",
-            "points": [
-                "Contribute maximum to 401(k): $23,000 + $7,500 catch-up if 50+ (2024 limits)",
-                "Utilize mega backdoor Roth if plan allows after-tax contributions",
-                "Consider defined benefit plans or cash balance plans for high earners",
-                "Implement tax diversification: traditional, Roth, and taxable accounts",
-                "Plan for healthcare costs in retirement - consider HSA as retirement account",
-                "Review estate planning and beneficiary designations annually"
-            ]
-        }
-    }
+    # Extract context for smarter responses, unless the caller already did
+    if financial_context is None:
+        financial_context = extract_financial_context(user_input)
 
-    # Enhanced keyword matching with financial intelligence
-    user_lower = user_input.lower()
-
-    # Create keyword mapping for better matching
-    keyword_mapping = {
-        "student loan": ["student", "loan", "college", "university", "education debt", "federal loan", "private loan"],
-        "emergency fund": ["emergency", "fund", "rainy day", "unexpected", "crisis", "job loss"],
-        "budget": ["budget", "budgeting", "spending plan", "money management", "track expenses"],
-        "spending": ["spending", "expenses", "cut costs", "reduce", "save money", "frugal"],
-        "save": ["saving", "savings", "save money", "build wealth", "accumulate"],
-        "stress": ["stress", "anxiety", "worried", "overwhelmed", "financial pressure"],
-        "investment": ["invest", "investing", "stocks", "bonds", "401k", "ira", "portfolio", "market"],
-        "retirement": ["retirement", "retire", "pension", "401k", "roth", "social security"]
-    }
-
-    # Score each category based on keyword matches
-    scores = {}
-    for category, keywords in keyword_mapping.items():
-        score = sum(1 for keyword in keywords if keyword in user_lower)
-        if score > 0:
-            scores[category] = score
-
-    # Find best match
-    if scores:
-        best_match = max(scores.keys(), key=lambda k: scores[k])
-        if best_match in fallback_responses:
-            response_data = fallback_responses[best_match]
-
-            # Enhanced formatting with financial context
-            mode_emoji = "🎓" if st.session_state.user_mode == 'student' else "💼"
-            formatted_response = f"{mode_emoji} **{response_data['title']}**\n\n"
-
-            # Add amount context if available
-            if financial_context.get('amounts'):
-                amounts = financial_context['amounts']
-                if len(amounts) == 1:
-                    formatted_response += f"💰 **Amount Focus:** ${amounts[0]:,.2f}\n\n"
-
-            formatted_response += f"**Key Insight:** {response_data['advice']}\n\n"
-            formatted_response += "**Actionable Steps:**\n"
-            for i, point in enumerate(response_data['points'], 1):
-                formatted_response += f"{i}. {point}\n"
-
-            # Add contextual tip
-            tip = get_contextual_tips(financial_context)
-            if tip:
-                formatted_response += f"\n💡 **Pro Tip:** {tip}\n"
-
-            return formatted_response
+    # Best-scoring topic of the shared rule-based catalog for this mode
+    response_data = rule_responses.match(user_input, st.session_state.user_mode)
+    if response_data:
+        amounts = financial_context.get('amounts', [])
+        return rule_responses.render(
+            response_data,
+            st.session_state.user_mode,
+            amount=amounts[0] if len(amounts) == 1 else None,
+            tip=get_contextual_tips(financial_context),
+        )
 
     # Enhanced default response with mode-specific guidance
     mode_emoji = "🎓" if st.session_state.user_mode == 'student' else "💼"
@@ -1928,7 +1830,7 @@ def show_session_history():
             if st.sidebar.button("🗑️ Clear All History", help="Delete all chat sessions"):
                 st.session_state.chat_sessions = {}
                 st.session_state.current_session_id = None
-                st.session_state.chat_history = []
+                set_chat_history()
                 st.rerun()
     else:
         st.sidebar.info("No previous sessions yet. Start chatting to create history!")
@@ -2003,14 +1905,14 @@ def show_speech_to_speech_page():
 
         if working_voice_input and working_mode == 'speech_to_speech':
             # Process voice input automatically
-            st.session_state.chat_history.append({"role": "user", "content": working_voice_input})
+            add_chat_message("user", working_voice_input)
 
             # Generate response using working system
             with st.spinner("🤖 Processing with DeepSeek AI..."):
                 result = process_speech_to_speech_complete(working_voice_input)
 
             if result["success"]:
-                st.session_state.chat_history.append({"role": "assistant", "content": result["response"]})
+                add_chat_message("assistant", result["response"])
 
                 st.success("🔊 ElevenLabs voice response ready!")
 
@@ -2137,6 +2039,35 @@ def show_chatbot_page():
     else:
         show_professional_interface()
 
+@st.cache_data(max_entries=CHAT_RENDER_CACHE_ENTRIES, show_spinner=False)
+def render_chat_message(role, mode, digest, _content):
+    """HTML/markdown for one chat message, cached by content hash (_content is not hashed)"""
+    if role == "user":
+        label = "🎓 You:" if mode == 'student' else "💼 You:"
+        return f'<div class="chat-message {mode}-message">\n<strong>{label}</strong> {html.escape(_content)}\n</div>\n\n'
+    # Blank lines around the content let it render as markdown inside the div.
+    # Escaping <, > and & keeps any HTML in model output (even a stray </div>)
+    # out of the page while leaving markdown syntax intact.
+    return f'<div class="chat-message {mode}-bot-message">\n\n{html.escape(_content, quote=False)}\n\n</div>\n\n'
+
+def render_chat_history(mode):
+    """Render the latest window of the chat as a single markdown block"""
+    history = st.session_state.chat_history
+    if len(history) <= CHAT_HISTORY_WINDOW:
+        st.session_state.chat_window = CHAT_HISTORY_WINDOW
+    hidden = max(0, len(history) - st.session_state.chat_window)
+    if hidden:
+        if st.button(f"⬆️ Load earlier messages ({hidden} more)", key=f"{mode}_load_earlier"):
+            st.session_state.chat_window += CHAT_HISTORY_WINDOW
+            st.rerun()
+
+    parts = []
+    for message in history[hidden:]:
+        # Messages from older sessions may predate the stored digest
+        digest = message.get("digest") or hashlib.blake2b(message["content"].encode("utf-8"), digest_size=16).hexdigest()
+        parts.append(render_chat_message(message["role"], mode, digest, message["content"]))
+    st.markdown('<div class="chat-container">\n\n' + "".join(parts) + '</div>', unsafe_allow_html=True)
+
 def show_student_interface():
     # Student-specific header and styling
     st.markdown("""
@@ -2157,7 +2088,7 @@ def show_student_interface():
     # Mode switch button
     if st.button("🔄 Switch to Professional Mode", key="switch_to_pro_top", help="Switch to professional financial advisor"):
         st.session_state.user_mode = 'professional'
-        st.session_state.chat_history = []
+        set_chat_history()
         st.rerun()
 
     # Student-specific scenarios
@@ -2183,12 +2114,12 @@ def show_student_interface():
                     load_model_silently()
 
                 # Add the full question as if user typed it
-                st.session_state.chat_history.append({"role": "user", "content": prompt})
+                add_chat_message("user", prompt)
 
                 # Generate response using the same logic as manual input
                 response = generate_response(prompt)
 
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                add_chat_message("assistant", response)
 
                 # Removed voice response generation
 
@@ -2201,20 +2132,7 @@ def show_student_interface():
 
     # Student-specific chat display
     if st.session_state.chat_history:
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        for message in st.session_state.chat_history:
-            if message["role"] == "user":
-                st.markdown(f"""
-                <div class="chat-message student-message">
-                    <strong>🎓 You:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                # Render student bot messages
-                st.markdown('<div class="chat-message student-bot-message">', unsafe_allow_html=True)
-                st.markdown(message["content"])
-                st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_chat_history('student')
     else:
         st.markdown("""
         <div style="text-align: center; padding: 2.5rem; background: white;
@@ -2249,7 +2167,7 @@ def show_student_interface():
             if not st.session_state.model_loaded and TRANSFORMERS_AVAILABLE:
                 load_model_silently()
 
-            st.session_state.chat_history.append({"role": "user", "content": input_text})
+            add_chat_message("user", input_text)
 
             # Show processing message for voice input
             if st.session_state.voice_input:
@@ -2258,7 +2176,7 @@ def show_student_interface():
             else:
                 response = generate_response(input_text)
 
-            st.session_state.chat_history.append({"role": "assistant", "content": response})
+            add_chat_message("assistant", response)
 
             # Removed voice response generation
 
@@ -2274,20 +2192,20 @@ def show_student_interface():
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("🔄 New Chat", key="student_clear", help="Start fresh conversation"):
-            st.session_state.chat_history = []
+            set_chat_history()
             st.rerun()
 
     with col2:
         if st.button("💡 Study Tips", key="student_tips", help="Get money-saving tips for students"):
-            st.session_state.chat_history.append({"role": "user", "content": "Student Money-Saving Tips"})
+            add_chat_message("user", "Student Money-Saving Tips")
             response = generate_response("Give me the top 10 money-saving tips every college student should know, including ways to save on textbooks, food, and entertainment.")
-            st.session_state.chat_history.append({"role": "assistant", "content": response})
+            add_chat_message("assistant", response)
             st.rerun()
 
     with col3:
         if st.button("🔄 Switch to Professional", key="switch_to_pro", help="Switch to professional mode"):
             st.session_state.user_mode = 'professional'
-            st.session_state.chat_history = []  # Clear chat when switching modes
+            set_chat_history()  # Clear chat when switching modes
             st.rerun()
 
 
@@ -2315,7 +2233,7 @@ def show_professional_interface():
     # Mode switch button
     if st.button("🔄 Switch to Student Mode", key="switch_to_student_top", help="Switch to student financial advisor"):
         st.session_state.user_mode = 'student'
-        st.session_state.chat_history = []
+        set_chat_history()
         st.rerun()
 
     # Professional-specific scenarios
@@ -2341,12 +2259,12 @@ def show_professional_interface():
                     load_model_silently()
 
                 # Add the full question as if user typed it
-                st.session_state.chat_history.append({"role": "user", "content": prompt})
+                add_chat_message("user", prompt)
 
                 # Generate response using the same logic as manual input
                 response = generate_response(prompt)
 
-                st.session_state.chat_history.append({"role": "assistant", "content": response})
+                add_chat_message("assistant", response)
 
                 # Removed voice response generation
 
@@ -2362,20 +2280,7 @@ def show_professional_chat():
 
     # Professional-specific chat display
     if st.session_state.chat_history:
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        for message in st.session_state.chat_history:
-            if message["role"] == "user":
-                st.markdown(f"""
-                <div class="chat-message professional-message">
-                    <strong>💼 You:</strong> {message["content"]}
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                # Render professional bot messages
-                st.markdown('<div class="chat-message professional-bot-message">', unsafe_allow_html=True)
-                st.markdown(message["content"])
-                st.markdown('</div>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_chat_history('professional')
     else:
         st.markdown("""
         <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
@@ -2409,7 +2314,7 @@ def show_professional_chat():
             if not st.session_state.model_loaded and TRANSFORMERS_AVAILABLE:
                 load_model_silently()
 
-            st.session_state.chat_history.append({"role": "user", "content": input_text})
+            add_chat_message("user", input_text)
 
             # Show processing message for voice input
             if st.session_state.voice_input:
@@ -2418,7 +2323,7 @@ def show_professional_chat():
             else:
                 response = generate_response(input_text)
 
-            st.session_state.chat_history.append({"role": "assistant", "content": response})
+            add_chat_message("assistant", response)
 
             # Removed voice response generation
 
@@ -2434,20 +2339,20 @@ def show_professional_chat():
     col1, col2, col3 = st.columns(3)
     with col1:
         if st.button("🔄 New Strategy Session", key="professional_clear", help="Start fresh consultation"):
-            st.session_state.chat_history = []
+            set_chat_history()
             st.rerun()
 
     with col2:
         if st.button("📊 Portfolio Analysis", key="professional_analysis", help="Get comprehensive portfolio review"):
-            st.session_state.chat_history.append({"role": "user", "content": "Portfolio Analysis Request"})
+            add_chat_message("user", "Portfolio Analysis Request")
             response = generate_response("Provide a comprehensive portfolio analysis framework including asset allocation, risk assessment, tax efficiency, and rebalancing strategies for a high-net-worth professional.")
-            st.session_state.chat_history.append({"role": "assistant", "content": response})
+            add_chat_message("assistant", response)
             st.rerun()
 
     with col3:
         if st.button("🔄 Switch to Student", key="switch_to_student", help="Switch to student mode"):
             st.session_state.user_mode = 'student'
-            st.session_state.chat_history = []  # Clear chat when switching modes
+            set_chat_history()  # Clear chat when switching modes
             st.rerun()
 
 def show_budget_page():
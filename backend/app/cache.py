@@ -0,0 +1,198 @@
+"""
+In-process caches: a thread-safe LRU cache with per-entry TTL, and a response
+cache for chat that adds an optional similarity tier on top of exact lookups.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9$%]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be can do does for from how i i'm in is it me my of on or should "
+    "so that the this to what when where which who why will with you your".split()
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return " ".join((text or "").lower().split()).rstrip("?!. ")
+
+
+def bag_of_words(text: str) -> Dict[str, float]:
+    """Default embedding: unit-normalized counts of non-stopword tokens."""
+    counts: Dict[str, float] = {}
+    for word in _WORD_RE.findall(text.lower()):
+        if word not in _STOPWORDS:
+            counts[word] = counts.get(word, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in counts.values()))
+    return {k: v / norm for k, v in counts.items()} if norm else {}
+
+
+def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl_seconds."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self):
+        """Snapshot of live (key, value) pairs, oldest first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v) for k, (exp, v) in self._data.items() if exp > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def save(self, path: str) -> int:
+        """
+        Write live entries to path as JSON (atomic rename), with their remaining TTL
+        measured against wall-clock time so they can be restored after a restart.
+        Keys must be strings or tuples of JSON values; values must be JSON-serializable.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = [
+                {"key": list(k) if isinstance(k, tuple) else k, "ttl": exp - now, "value": v}
+                for k, (exp, v) in self._data.items() if exp > now
+            ]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "entries": entries}, f)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load(self, path: str) -> int:
+        """Restore entries written by save(), skipping those that expired meanwhile."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        elapsed = max(0.0, time.time() - data.get("saved_at", 0))
+        loaded = 0
+        for entry in data.get("entries", []):
+            ttl = entry["ttl"] - elapsed
+            if ttl > 0:
+                key = entry["key"]
+                self.set(tuple(key) if isinstance(key, list) else key, entry["value"], ttl)
+                loaded += 1
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ResponseCache:
+    """
+    Caches generated answers by (normalized question, bucket), where bucket holds
+    whatever else shapes the answer (mode, scenario). With similarity_threshold > 0,
+    an exact miss falls back to the most similar cached question in the same bucket.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.0,
+        embed_fn: Callable[[str], Dict[str, float]] = bag_of_words,
+    ):
+        self._store = TTLCache(max_entries, ttl_seconds)
+        self.similarity_threshold = similarity_threshold
+        self._embed = embed_fn
+        self.semantic_hits = 0
+
+    def get(self, text: str, bucket: Hashable = None) -> Optional[Any]:
+        key = (bucket, normalize_text(text))
+        entry = self._store.get(key)
+        if entry is not None:
+            return entry[1]
+        if self.similarity_threshold <= 0:
+            return None
+        vector = self._embed(key[1])
+        if not vector:
+            return None
+        best, best_score = None, self.similarity_threshold
+        for (entry_bucket, _), (entry_vector, value) in self._store.items():
+            if entry_bucket != bucket:
+                continue
+            score = _cosine(vector, entry_vector)
+            if score >= best_score:
+                best, best_score = value, score
+        if best is not None:
+            self.semantic_hits += 1
+        return best
+
+    def set(self, text: str, value: Any, bucket: Hashable = None) -> None:
+        normalized = normalize_text(text)
+        vector = self._embed(normalized) if self.similarity_threshold > 0 else None
+        self._store.set((bucket, normalized), (vector, value))
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._store.stats()
+        lookups = stats["hits"] + stats["misses"]
+        # Semantic hits are exact-key misses that were still served from cache
+        stats["hit_rate"] = round((stats["hits"] + self.semantic_hits) / lookups, 4) if lookups else 0.0
+        stats["semantic_hits"] = self.semantic_hits
+        stats["similarity_threshold"] = self.similarity_threshold
+        return stats
@@ -0,0 +1,128 @@
+"""
+Columnar batch versions of the calculators in finance.py.
+
+Each input field is a list with one value per scenario; every output field is
+a list in the same order. Calculations run as NumPy array expressions over the
+whole batch, so they match the per-scenario functions value for value without
+a Python-level loop.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+FINANCE_BATCH_MAX_ROWS = int(os.getenv("FINANCE_BATCH_MAX_ROWS", "200000"))
+
+
+class BudgetBatchInput(BaseModel):
+    monthly_income: List[float]
+    rent: List[float]
+    utilities: List[float]
+    insurance: List[float]
+    food: List[float]
+    transportation: List[float]
+    entertainment: List[float]
+    other: List[float]
+
+class BudgetBatchAnalysis(BaseModel):
+    total_expenses: List[float]
+    remaining: List[float]
+    needs_target: List[float]
+    needs_actual: List[float]
+    wants_target: List[float]
+    wants_actual: List[float]
+    savings_target: List[float]
+    savings_actual: List[float]
+
+class SavingsBatchInput(BaseModel):
+    target_amount: List[float]
+    current_amount: List[float]
+    monthly_contribution: List[float]
+    include_projection: bool = False  # adds the 12-month projection, one row per scenario
+
+class SavingsBatchProjection(BaseModel):
+    progress_pct: List[float]
+    remaining: List[float]
+    months_to_goal: List[Optional[float]]  # null where the goal is never reached
+    projection_12mo: Optional[List[List[float]]] = None
+
+class InvestBatchInput(BaseModel):
+    initial_investment: List[float]
+    monthly_investment: List[float]
+    annual_return_pct: List[float]
+    years: List[int]
+
+class InvestBatchOutput(BaseModel):
+    total_future_value: List[float]
+    total_invested: List[float]
+    total_gains: List[float]
+
+
+def columns(payload: BaseModel, *names: str) -> Dict[str, np.ndarray]:
+    """
+    Input columns as float64 arrays
+
+    Raises:
+        ValueError: if the columns differ in length or exceed FINANCE_BATCH_MAX_ROWS
+    """
+    arrays = {name: np.asarray(getattr(payload, name), dtype=np.float64) for name in names}
+    lengths = {len(a) for a in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"All columns must have the same length, got {sorted(lengths)}")
+    if lengths and lengths.pop() > FINANCE_BATCH_MAX_ROWS:
+        raise ValueError(f"Batch too large (max {FINANCE_BATCH_MAX_ROWS} rows)")
+    return arrays
+
+
+def analyze_budget_batch(data: BudgetBatchInput) -> BudgetBatchAnalysis:
+    c = columns(data, "monthly_income", "rent", "utilities", "insurance", "food", "transportation", "entertainment", "other")
+    needs_actual = c["rent"] + c["utilities"] + c["insurance"] + c["food"]
+    wants_actual = c["transportation"] + c["entertainment"] + c["other"]
+    total_expenses = needs_actual + wants_actual
+    remaining = c["monthly_income"] - total_expenses
+    return BudgetBatchAnalysis(
+        total_expenses=total_expenses.tolist(),
+        remaining=remaining.tolist(),
+        needs_target=(c["monthly_income"] * 0.5).tolist(),
+        needs_actual=needs_actual.tolist(),
+        wants_target=(c["monthly_income"] * 0.3).tolist(),
+        wants_actual=wants_actual.tolist(),
+        savings_target=(c["monthly_income"] * 0.2).tolist(),
+        savings_actual=np.maximum(remaining, 0).tolist(),
+    )
+
+
+def project_savings_batch(data: SavingsBatchInput) -> SavingsBatchProjection:
+    c = columns(data, "target_amount", "current_amount", "monthly_contribution")
+    target, current, contribution = c["target_amount"], c["current_amount"], c["monthly_contribution"]
+    progress_pct = np.divide(current * 100, target, out=np.zeros_like(target), where=target > 0)
+    remaining = target - current
+    months_to_goal = np.divide(remaining, contribution, out=np.full_like(remaining, np.nan), where=contribution > 0)
+    projection = None
+    if data.include_projection:
+        months = np.arange(1, 13)
+        projection = np.minimum(current[:, None] + contribution[:, None] * months, target[:, None]).tolist()
+    return SavingsBatchProjection(
+        progress_pct=progress_pct.tolist(),
+        remaining=remaining.tolist(),
+        months_to_goal=np.where(np.isnan(months_to_goal), None, months_to_goal).tolist(),
+        projection_12mo=projection,
+    )
+
+
+def invest_calculate_batch(data: InvestBatchInput) -> InvestBatchOutput:
+    c = columns(data, "initial_investment", "monthly_investment", "annual_return_pct", "years")
+    annual_rate = c["annual_return_pct"] / 100.0
+    monthly_rate = annual_rate / 12.0
+    months = c["years"] * 12
+    fv_initial = c["initial_investment"] * (1 + annual_rate) ** c["years"]
+    growth = np.divide((1 + monthly_rate) ** months - 1, monthly_rate, out=months.copy(), where=monthly_rate > 0)
+    total_future_value = fv_initial + c["monthly_investment"] * growth
+    total_invested = c["initial_investment"] + c["monthly_investment"] * months
+    return InvestBatchOutput(
+        total_future_value=total_future_value.tolist(),
+        total_invested=total_invested.tolist(),
+        total_gains=(total_future_value - total_invested).tolist(),
+    )
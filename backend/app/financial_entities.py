@@ -0,0 +1,101 @@
+"""
+Extraction of the financial details mentioned in a chat message.
+
+The text is lowercased once and scanned by two precompiled regexes: a single
+alternation over every keyword of every category, and one for numbers.
+Keyword matches are deduplicated before any per-keyword Python work. Folding
+the numbers into the keyword regex as well measured slower, because the
+regex engine then tries every alternative at every position
+(see benchmark_entities.py).
+- keywords only match whole words, optionally plural, so "car" does not fire
+  on "career" or "ira" on "inspiration";
+- a keyword also reports the keywords it contains, so "student loan" yields
+  the debt type and the "student" life stage;
+- a number followed by months/years/weeks is a time period, any other number
+  is an amount ("$5k" is 5000); percentages are skipped.
+
+Used by the Streamlit app and by the backend prompt builder.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# category -> keywords, reported in this order
+KEYWORDS: Dict[str, List[str]] = {
+    "debt_types": ["student loan", "credit card", "mortgage", "car loan", "personal loan"],
+    "investment_types": ["stocks", "bonds", "401k", "ira", "roth", "mutual fund", "etf"],
+    "account_types": ["checking", "savings", "high-yield", "money market"],
+    "goals": ["retirement", "house", "car", "vacation", "wedding", "education"],
+    "life_stage": ["student", "graduate", "married", "single", "parent", "retired"],
+}
+
+_PERIODS = {"month": "months", "year": "years", "week": "weeks"}
+
+_CATEGORIES = list(KEYWORDS)
+
+
+def _keyword_hits() -> Dict[str, List[Tuple[int, int]]]:
+    """keyword -> (category index, keyword index) of itself and every keyword inside it."""
+    hits = {}
+    for keywords in KEYWORDS.values():
+        for outer in keywords:
+            hits[outer] = [
+                (c, k)
+                for c, inner_keywords in enumerate(KEYWORDS.values())
+                for k, inner in enumerate(inner_keywords)
+                if re.search(rf"\b{re.escape(inner)}\b", outer)
+            ]
+    return hits
+
+
+_KEYWORD_HITS = _keyword_hits()
+# Longest keywords first so "student loan" wins over "student"; a plural
+# folds onto its keyword ("mortgages" -> "mortgage")
+_KEYWORD_RE = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_HITS, key=len, reverse=True)) + r")s?\b"
+)
+# number, decimals, "k" suffix, percent sign, time unit
+_NUMBER_RE = re.compile(
+    r"(?<![\w.,])\$?(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?(k\b)?(\s*%)?(?:\s*(month|year|week)s?\b)?"
+)
+
+
+def extract_financial_context(text: str) -> Dict[str, list]:
+    """
+    Amounts, time periods and keywords found in text, e.g.
+    {"amounts": [5000.0], "months": [6], "debt_types": ["credit card"]}.
+    Only categories with at least one match are present.
+    """
+    text = text.lower()
+    context: Dict[str, list] = {}
+    for number, fraction, thousands, percent, period in _NUMBER_RE.findall(text):
+        if percent or number + thousands in _KEYWORD_HITS:  # "401k" is an account, not $401,000
+            continue
+        number = number.replace(",", "")
+        if period:
+            context.setdefault(_PERIODS[period], []).append(int(number))
+        else:
+            amount = float(number + fraction)
+            if thousands:
+                amount *= 1000
+            context.setdefault("amounts", []).append(amount)
+
+    hits = set()
+    for keyword in set(_KEYWORD_RE.findall(text)):
+        hits.update(_KEYWORD_HITS[keyword])
+    for c, k in sorted(hits):
+        category = _CATEGORIES[c]
+        context.setdefault(category, []).append(KEYWORDS[category][k])
+    return context
+
+
+def context_summary(context: Dict[str, list], user_mode: str) -> str:
+    """One-line prompt hint built from extract_financial_context's result ("" if nothing applies)."""
+    parts = []
+    if context.get("amounts"):
+        parts.append(f"Amounts mentioned: ${', $'.join(map(str, context['amounts']))}.")
+    if context.get("debt_types"):
+        parts.append(f"Focus on {', '.join(context['debt_types'])} management.")
+    if context.get("investment_types"):
+        parts.append(f"Provide {user_mode}-appropriate guidance on {', '.join(context['investment_types'])}.")
+    return " ".join(parts)
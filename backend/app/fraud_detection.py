@@ -2,19 +2,74 @@
 FraudAwarenessGPT - AI-powered fraud detection service using Groq API
 """
 
+import asyncio
+import codecs
+import hashlib
 import os
 import json
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, List, Tuple, AsyncIterator
+from groq import Groq, AsyncGroq
+
+from .providers import get_client, provider_setting
+from .fraud_screen import FRAUD_PRESCREEN, MODEL_NAME as SCREEN_MODEL, screen, to_result
+from .cache import TTLCache, normalize_text
 
 # Initialize Groq client
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+GROQ_MODEL = "llama3-8b-8192"  # Using Llama 3 8B model
 if not GROQ_API_KEY:
-    print("Warning: GROQ_API_KEY environment variable not set. Fraud detection will use fallback responses.")
+    print("Warning: GROQ_API_KEY environment variable not set. Fraud detection will use the local screen only.")
 
 client = None
 if GROQ_API_KEY:
-    client = Groq(api_key=GROQ_API_KEY)
+    client = Groq(api_key=GROQ_API_KEY, timeout=provider_setting("groq", "timeout_seconds"), max_retries=provider_setting("groq", "max_retries"))
+
+_async_client = None
+_async_client_http = None  # the pooled httpx client _async_client was built on
+
+# Batch scans: per-batch cap on concurrent Groq calls (the groq provider pool
+# still bounds the process as a whole) and the largest accepted batch
+FRAUD_BATCH_CONCURRENCY = int(os.getenv("FRAUD_BATCH_CONCURRENCY", "8"))
+FRAUD_BATCH_MAX_ITEMS = int(os.getenv("FRAUD_BATCH_MAX_ITEMS", "1000"))
+
+# Ask Groq for JSON-mode output (response_format=json_object)
+FRAUD_JSON_MODE = os.getenv("FRAUD_JSON_MODE", "1") not in ("0", "false", "False")
+
+# Long documents are scanned in overlapping chunks; only this many findings are kept
+FRAUD_SCAN_CHUNK_CHARS = int(os.getenv("FRAUD_SCAN_CHUNK_CHARS", "6000"))
+FRAUD_SCAN_OVERLAP_CHARS = int(os.getenv("FRAUD_SCAN_OVERLAP_CHARS", "300"))
+FRAUD_SCAN_MAX_FINDINGS = int(os.getenv("FRAUD_SCAN_MAX_FINDINGS", "20"))
+
+# Result cache keyed by normalized content hash; FRAUD_CACHE_PATH persists it across restarts
+FRAUD_CACHE_MAX_ENTRIES = int(os.getenv("FRAUD_CACHE_MAX_ENTRIES", "50000"))
+FRAUD_CACHE_TTL_SECONDS = float(os.getenv("FRAUD_CACHE_TTL_SECONDS", "86400"))
+FRAUD_CACHE_PATH = os.getenv("FRAUD_CACHE_PATH", "")
+
+fraud_cache = TTLCache(FRAUD_CACHE_MAX_ENTRIES, FRAUD_CACHE_TTL_SECONDS)
+if FRAUD_CACHE_PATH:
+    fraud_cache.load(FRAUD_CACHE_PATH)
+
+
+def _get_async_client():
+    """
+    AsyncGroq client sharing the pooled, concurrency-limited groq HTTP client.
+    Rebuilt whenever that pool is replaced, e.g. after providers.aclose_all()
+    in a lifespan shutdown, so it never holds on to a closed client.
+    """
+    global _async_client, _async_client_http
+    if not GROQ_API_KEY:
+        return None
+    http = get_client("groq").http
+    if _async_client is None or _async_client_http is not http:
+        _async_client_http = http
+        _async_client = AsyncGroq(
+            api_key=GROQ_API_KEY,
+            http_client=http,
+            timeout=provider_setting("groq", "timeout_seconds"),
+            max_retries=provider_setting("groq", "max_retries"),
+        )
+    return _async_client
+
 
 SYSTEM_PROMPT = """
 You are FraudAwarenessGPT, an AI expert in detecting financial scams and suspicious content.
@@ -23,7 +78,7 @@ Your task:
 2. Summarize the scam method in simple words.
 3. Generate a short awareness warning for the public.
 
-Format your response as:
+Respond only with a JSON object in this format:
 {
   "detected_content": "...",
   "awareness_message": "..."
@@ -33,6 +88,260 @@ If no suspicious content is found, reply with:
 {"detected_content": "None", "awareness_message": "No scam detected."}
 """
 
+FINANCIAL_SYSTEM_PROMPT = "You are an expert fraud detection AI specializing in financial scams."
+
+FINANCIAL_PROMPT = """
+You are FraudAwarenessGPT, specialized in detecting financial scams and fraudulent schemes.
+
+Analyze this financial content for:
+- Investment scams (Ponzi schemes, fake investments)
+- Phishing attempts (fake bank emails, credential theft)
+- Romance scams involving money
+- Cryptocurrency scams
+- Fake loan offers
+- Identity theft attempts
+- Advance fee frauds
+- Fake financial advisors
+
+Text to analyze: "{content}"
+
+Respond in JSON format:
+{{
+  "detected_content": "Description of any scam/fraud detected or 'None'",
+  "awareness_message": "Public warning message or 'No scam detected.'"
+}}
+"""
+
+# Per analysis type: completion budget and the user-facing wording of fallbacks
+_ANALYSIS = {
+    "general": {
+        "max_tokens": 500,
+        "unavailable": "Fraud detection service requires GROQ_API_KEY environment variable. Please set it to enable AI-powered fraud detection.",
+        "error": "Fraud detection service temporarily unavailable",
+    },
+    "financial": {
+        "max_tokens": 600,
+        "unavailable": "Financial fraud detection requires GROQ_API_KEY environment variable. Please set it to enable AI-powered analysis.",
+        "error": "Financial fraud detection temporarily unavailable",
+    },
+}
+
+
+def _messages(text: str, analysis_type: str) -> List[Dict[str, str]]:
+    if analysis_type == "financial":
+        return [
+            {"role": "system", "content": FINANCIAL_SYSTEM_PROMPT},
+            {"role": "user", "content": FINANCIAL_PROMPT.format(content=text)},
+        ]
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Analyze this text for fraud/scam content: {text}"},
+    ]
+
+
+def _completion_kwargs(text: str, analysis_type: str) -> Dict[str, Any]:
+    return dict(
+        messages=_messages(text, analysis_type),
+        model=GROQ_MODEL,
+        temperature=0.1,  # Low temperature for consistent detection
+        max_tokens=_ANALYSIS[analysis_type]["max_tokens"],
+        top_p=1,
+        stream=False,
+        **({"response_format": {"type": "json_object"}} if FRAUD_JSON_MODE else {}),
+    )
+
+
+def _unavailable_result(analysis_type: str) -> Dict[str, Any]:
+    return {
+        "detected_content": "Service unavailable",
+        "awareness_message": _ANALYSIS[analysis_type]["unavailable"],
+        "provider": "fallback",
+        "model": "none",
+        "success": False,
+        "analysis_type": analysis_type,
+    }
+
+
+def _error_result(e: Exception, analysis_type: str) -> Dict[str, Any]:
+    return {
+        "detected_content": "Error",
+        "awareness_message": f"{_ANALYSIS[analysis_type]['error']}: {str(e)}",
+        "provider": "fallback",
+        "model": "none",
+        "success": False,
+        "analysis_type": analysis_type,
+    }
+
+
+# How completions were turned into results: parsed directly, extracted from
+# surrounding prose/fences, recovered from a JSON-mode validation error, or unusable
+parse_stats = {"parsed": 0, "extracted": 0, "recovered": 0, "invalid": 0}
+
+_FIELD_DEFAULTS = {"detected_content": "Unknown", "awareness_message": "Analysis completed"}
+
+
+def extract_json_object(text: str):
+    """
+    First JSON object in text, tolerating code fences and prose around it
+
+    Returns:
+        (object, exact) where exact is True when text was a bare JSON object,
+        or (None, False) when no object could be decoded
+    """
+    text = (text or "").strip()
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            return value, True
+    except ValueError:
+        pass
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value, False
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    return None, False
+
+
+def _validate_fields(obj: Dict[str, Any]):
+    """Map a decoded object onto the response fields, or None if neither field is present."""
+    normalized = {str(k).strip().lower().replace(" ", "_").replace("-", "_"): v for k, v in obj.items()}
+    if not any(field in normalized for field in _FIELD_DEFAULTS):
+        return None
+    fields = {}
+    for field, default in _FIELD_DEFAULTS.items():
+        value = normalized.get(field)
+        if isinstance(value, list):
+            value = "; ".join(str(v) for v in value)
+        elif isinstance(value, dict):
+            value = json.dumps(value)
+        fields[field] = str(value).strip() if value not in (None, "") else default
+    return fields
+
+
+def _verdict(detected_content: str) -> str:
+    """scam, benign or unknown; the prompts ask the model for "None" when nothing is found."""
+    detected = detected_content.strip().lower()
+    if detected in ("none", "no scam detected"):
+        return "benign"
+    return "unknown" if detected in ("", "unknown") else "scam"
+
+
+def _parse_completion(response_content: str, analysis_type: str, recovered: bool = False) -> Dict[str, Any]:
+    obj, exact = extract_json_object(response_content)
+    fields = _validate_fields(obj) if obj is not None else None
+    if fields is None:
+        # Unusable output: keep the raw text as the message rather than failing the call
+        parse_stats["invalid"] += 1
+        fields = {"detected_content": "Analysis completed", "awareness_message": (response_content or "").strip()}
+        verdict = "unknown"
+    else:
+        parse_stats["recovered" if recovered else "parsed" if exact else "extracted"] += 1
+        verdict = _verdict(fields["detected_content"])
+    return {
+        **fields,
+        "verdict": verdict,
+        "provider": "groq",
+        "model": GROQ_MODEL,
+        "success": True,
+        "analysis_type": analysis_type,
+    }
+
+
+def _failed_generation(e: Exception):
+    """The model output Groq rejected in JSON mode (json_validate_failed), if any."""
+    body = getattr(e, "body", None)
+    if isinstance(body, dict):
+        error = body.get("error", body)
+        if isinstance(error, dict) and error.get("failed_generation"):
+            return error["failed_generation"]
+    return None
+
+
+def _prescreen(text: str, analysis_type: str):
+    """Local verdict when the screen is confident, or whenever Groq is not configured."""
+    if not FRAUD_PRESCREEN:
+        return None
+    screened = screen(text)
+    if screened["verdict"] != "ambiguous" or not GROQ_API_KEY:
+        return to_result(screened, analysis_type)
+    return None
+
+
+def _cache_key(text: str, analysis_type: str) -> tuple:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return (analysis_type, GROQ_MODEL, digest)
+
+
+def _cache_lookup(text: str, analysis_type: str):
+    key = _cache_key(text, analysis_type)
+    hit = fraud_cache.get(key)
+    return key, (dict(hit, cached=True) if hit is not None else None)
+
+
+def _cache_store(key: tuple, result: Dict[str, Any]) -> Dict[str, Any]:
+    # Only LLM verdicts are worth caching: local screen results are already
+    # cheap, and unavailable/error results should be retried
+    if result["success"] and result["provider"] == "groq":
+        fraud_cache.set(key, result)
+    return result
+
+
+def save_cache() -> int:
+    """Persist fraud_cache to FRAUD_CACHE_PATH, if configured."""
+    return fraud_cache.save(FRAUD_CACHE_PATH) if FRAUD_CACHE_PATH else 0
+
+
+def _analyze_uncached(text: str, analysis_type: str) -> Dict[str, Any]:
+    local = _prescreen(text, analysis_type)
+    if local is not None:
+        return local
+    if not client:
+        return _unavailable_result(analysis_type)
+    try:
+        chat_completion = client.chat.completions.create(**_completion_kwargs(text, analysis_type))
+        return _parse_completion(chat_completion.choices[0].message.content, analysis_type)
+    except Exception as e:
+        failed = _failed_generation(e)
+        if failed:
+            return _parse_completion(failed, analysis_type, recovered=True)
+        # Fallback response if Groq API fails
+        return _error_result(e, analysis_type)
+
+
+async def _aanalyze_uncached(text: str, analysis_type: str) -> Dict[str, Any]:
+    local = _prescreen(text, analysis_type)
+    if local is not None:
+        return local
+    async_client = _get_async_client()
+    if not async_client:
+        return _unavailable_result(analysis_type)
+    try:
+        async with get_client("groq").limit:
+            chat_completion = await async_client.chat.completions.create(**_completion_kwargs(text, analysis_type))
+        return _parse_completion(chat_completion.choices[0].message.content, analysis_type)
+    except Exception as e:
+        failed = _failed_generation(e)
+        if failed:
+            return _parse_completion(failed, analysis_type, recovered=True)
+        return _error_result(e, analysis_type)
+
+
+def _analyze(text: str, analysis_type: str) -> Dict[str, Any]:
+    key, hit = _cache_lookup(text, analysis_type)
+    return hit if hit is not None else _cache_store(key, _analyze_uncached(text, analysis_type))
+
+
+async def _aanalyze(text: str, analysis_type: str) -> Dict[str, Any]:
+    key, hit = _cache_lookup(text, analysis_type)
+    return hit if hit is not None else _cache_store(key, await _aanalyze_uncached(text, analysis_type))
+
+
 def detect_fraud(text: str) -> Dict[str, Any]:
     """
     Detect fraud/scam content in the given text using Groq API
@@ -43,67 +352,13 @@ def detect_fraud(text: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing detected_content and awareness_message
     """
-    if not client:
-        return {
-            "detected_content": "Service unavailable",
-            "awareness_message": "Fraud detection service requires GROQ_API_KEY environment variable. Please set it to enable AI-powered fraud detection.",
-            "provider": "fallback",
-            "model": "none",
-            "success": False
-        }
+    return _analyze(text, "general")
+
+
+async def adetect_fraud(text: str) -> Dict[str, Any]:
+    """Async variant of detect_fraud using the pooled AsyncGroq client."""
+    return await _aanalyze(text, "general")
 
-    try:
-        # Create the chat completion request
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": SYSTEM_PROMPT
-                },
-                {
-                    "role": "user", 
-                    "content": f"Analyze this text for fraud/scam content: {text}"
-                }
-            ],
-            model="llama3-8b-8192",  # Using Llama 3 8B model
-            temperature=0.1,  # Low temperature for consistent detection
-            max_tokens=500,
-            top_p=1,
-            stream=False
-        )
-        
-        # Extract the response
-        response_content = chat_completion.choices[0].message.content
-        
-        # Try to parse as JSON
-        try:
-            result = json.loads(response_content)
-            return {
-                "detected_content": result.get("detected_content", "Unknown"),
-                "awareness_message": result.get("awareness_message", "Analysis completed"),
-                "provider": "groq",
-                "model": "llama3-8b-8192",
-                "success": True
-            }
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw response
-            return {
-                "detected_content": "Analysis completed",
-                "awareness_message": response_content,
-                "provider": "groq",
-                "model": "llama3-8b-8192", 
-                "success": True
-            }
-            
-    except Exception as e:
-        # Fallback response if Groq API fails
-        return {
-            "detected_content": "Error",
-            "awareness_message": f"Fraud detection service temporarily unavailable: {str(e)}",
-            "provider": "fallback",
-            "model": "none",
-            "success": False
-        }
 
 def analyze_financial_content(content: str) -> Dict[str, Any]:
     """
@@ -115,89 +370,208 @@ def analyze_financial_content(content: str) -> Dict[str, Any]:
     Returns:
         Enhanced fraud detection results
     """
-    if not client:
-        return {
-            "detected_content": "Service unavailable",
-            "awareness_message": "Financial fraud detection requires GROQ_API_KEY environment variable. Please set it to enable AI-powered analysis.",
-            "provider": "fallback",
-            "model": "none",
-            "success": False,
-            "analysis_type": "financial"
-        }
+    return _analyze(content, "financial")
 
-    # Enhanced prompt for financial context
-    financial_prompt = f"""
-You are FraudAwarenessGPT, specialized in detecting financial scams and fraudulent schemes.
 
-Analyze this financial content for:
-- Investment scams (Ponzi schemes, fake investments)
-- Phishing attempts (fake bank emails, credential theft)
-- Romance scams involving money
-- Cryptocurrency scams
-- Fake loan offers
-- Identity theft attempts
-- Advance fee frauds
-- Fake financial advisors
+async def aanalyze_financial_content(content: str) -> Dict[str, Any]:
+    """Async variant of analyze_financial_content using the pooled AsyncGroq client."""
+    return await _aanalyze(content, "financial")
 
-Text to analyze: "{content}"
 
-Respond in JSON format:
-{{
-  "detected_content": "Description of any scam/fraud detected or 'None'",
-  "awareness_message": "Public warning message or 'No scam detected.'"
-}}
-"""
-    
-    try:
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert fraud detection AI specializing in financial scams."
-                },
-                {
-                    "role": "user",
-                    "content": financial_prompt
-                }
-            ],
-            model="llama3-8b-8192",
-            temperature=0.1,
-            max_tokens=600,
-            top_p=1,
-            stream=False
-        )
-        
-        response_content = chat_completion.choices[0].message.content
-        
+async def adetect_fraud_batch(items: List[Tuple[str, str]], concurrency: int = None) -> List[Dict[str, Any]]:
+    """
+    Analyze many (text, analysis_type) pairs concurrently
+
+    Identical pairs are analyzed once. At most `concurrency` Groq calls run at
+    a time; a failing item yields an unsuccessful result instead of failing
+    the batch.
+
+    Returns:
+        One result dict per input item, in input order
+    """
+    keys = [("financial" if analysis_type == "financial" else "general", text) for text, analysis_type in items]
+    unique = list(dict.fromkeys(keys))
+    limit = asyncio.Semaphore(concurrency or FRAUD_BATCH_CONCURRENCY)
+
+    async def run(key):
+        async with limit:
+            return await _aanalyze(key[1], key[0])
+
+    outcomes = await asyncio.gather(*(run(key) for key in unique), return_exceptions=True)
+    results = {
+        key: _error_result(outcome, key[0]) if isinstance(outcome, BaseException) else outcome
+        for key, outcome in zip(unique, outcomes)
+    }
+    return [dict(results[key]) for key in keys]
+
+
+async def _chunks(pieces: AsyncIterator[str], size: int, overlap: int) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Re-cut a stream of text pieces into (offset, chunk) windows of at most `size`
+    characters that overlap by `overlap`, preferring to cut at whitespace so a
+    phrase spanning the boundary appears whole in at least one chunk.
+    """
+    buffer, offset, emitted = "", 0, False
+    async for piece in pieces:
+        buffer += piece
+        while len(buffer) >= size:
+            boundary = max(buffer.rfind(" ", size - size // 10, size), buffer.rfind("\n", size - size // 10, size))
+            cut = boundary + 1 if boundary >= 0 else size
+            yield offset, buffer[:cut]
+            emitted = True
+            step = max(1, cut - overlap)
+            buffer, offset = buffer[step:], offset + step
+    # The tail is already covered when it fits inside the previous chunk's overlap
+    if buffer.strip() and not (emitted and len(buffer) <= overlap):
+        yield offset, buffer
+
+
+async def aiter_text(text: str, piece_chars: int = 65536) -> AsyncIterator[str]:
+    for i in range(0, len(text), piece_chars):
+        yield text[i:i + piece_chars]
+
+
+async def adecode(byte_pieces: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Incrementally decode a UTF-8 byte stream (e.g. a request body)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for piece in byte_pieces:
+        text = decoder.decode(piece)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _flagged(result: Dict[str, Any]) -> bool:
+    """
+    A chunk with a real scam verdict: an LLM flag or a confident local screen.
+    Inconclusive local results and unusable completions are not findings.
+    """
+    return result["success"] and result.get("verdict") == "scam"
+
+
+def _merge_findings(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort findings by offset and merge spans that overlap (e.g. via chunk overlap)."""
+    merged: List[Dict[str, Any]] = []
+    for finding in sorted(findings, key=lambda f: f["start"]):
+        if merged and finding["start"] <= merged[-1]["end"]:
+            merged[-1]["end"] = max(merged[-1]["end"], finding["end"])
+        else:
+            merged.append(dict(finding))
+    return merged
+
+
+async def ascan_document(
+    pieces: AsyncIterator[str],
+    analysis_type: str = "general",
+    chunk_chars: int = None,
+    overlap_chars: int = None,
+    concurrency: int = None,
+) -> Dict[str, Any]:
+    """
+    Scan a document of any length for fraud, chunk by chunk
+
+    Chunks are analyzed concurrently while the input is still being read; at
+    most `concurrency` chunks are in flight, so memory stays bounded by
+    concurrency x chunk size. Scanning stops as soon as a chunk yields a
+    confident scam finding.
+
+    Returns:
+        A detect_fraud-style result merged over all scanned chunks, plus
+        `findings` with character offsets, `chunks_scanned`, `chars_scanned`,
+        `failed_chunks` and `stopped_early`
+    """
+    analysis_type = "financial" if analysis_type == "financial" else "general"
+    chunk_chars = chunk_chars or FRAUD_SCAN_CHUNK_CHARS
+    overlap_chars = min(overlap_chars if overlap_chars is not None else FRAUD_SCAN_OVERLAP_CHARS, chunk_chars // 2)
+    limit = asyncio.Semaphore(concurrency or FRAUD_BATCH_CONCURRENCY)
+    state = {"chunks": 0, "chars": 0, "failed": 0, "stop": False, "providers": set(), "first_error": None}
+    findings: List[Dict[str, Any]] = []
+
+    async def run(start: int, text: str):
         try:
-            result = json.loads(response_content)
-            return {
-                "detected_content": result.get("detected_content", "Unknown"),
-                "awareness_message": result.get("awareness_message", "Analysis completed"),
-                "provider": "groq",
-                "model": "llama3-8b-8192",
-                "success": True,
-                "analysis_type": "financial"
-            }
-        except json.JSONDecodeError:
-            return {
-                "detected_content": "Analysis completed",
-                "awareness_message": response_content,
-                "provider": "groq", 
-                "model": "llama3-8b-8192",
-                "success": True,
-                "analysis_type": "financial"
-            }
-            
-    except Exception as e:
-        return {
-            "detected_content": "Error",
-            "awareness_message": f"Financial fraud detection temporarily unavailable: {str(e)}",
-            "provider": "fallback",
-            "model": "none", 
-            "success": False,
-            "analysis_type": "financial"
+            return start, start + len(text), await _aanalyze(text, analysis_type)
+        except Exception as e:
+            return start, start + len(text), _error_result(e, analysis_type)
+        finally:
+            limit.release()
+
+    def collect(task) -> None:
+        start, end, result = task.result()
+        state["chunks"] += 1
+        state["chars"] = max(state["chars"], end)
+        if not result["success"]:
+            state["failed"] += 1
+            state["first_error"] = state["first_error"] or result
+            return
+        state["providers"].add(result["provider"])
+        if _flagged(result):
+            if len(findings) < FRAUD_SCAN_MAX_FINDINGS:
+                findings.append({
+                    "start": start,
+                    "end": end,
+                    "detected_content": result["detected_content"],
+                    "awareness_message": result["awareness_message"],
+                    "provider": result["provider"],
+                })
+            state["stop"] = True
+
+    pending = set()
+    chunks = _chunks(pieces, chunk_chars, overlap_chars)
+    try:
+        async for start, text in chunks:
+            await limit.acquire()
+            for task in [t for t in pending if t.done()]:
+                pending.discard(task)
+                collect(task)
+            if state["stop"]:
+                limit.release()
+                break
+            pending.add(asyncio.ensure_future(run(start, text)))
+        while pending and not state["stop"]:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                collect(task)
+    finally:
+        for task in pending:
+            task.cancel()
+        await chunks.aclose()
+
+    if state["chunks"] and state["failed"] == state["chunks"]:
+        result = dict(state["first_error"])
+    else:
+        merged = _merge_findings(findings)
+        providers = state["providers"]
+        provider = "groq" if "groq" in providers else "local" if "local" in providers else "fallback"
+        if merged:
+            detected = "; ".join(dict.fromkeys(f["detected_content"] for f in merged))
+            message = merged[0]["awareness_message"]
+        else:
+            detected, message = "None", "No scam detected."
+        result = {
+            "detected_content": detected,
+            "awareness_message": message,
+            "provider": provider,
+            "model": {"groq": GROQ_MODEL, "local": SCREEN_MODEL}.get(provider, "none"),
+            "success": True,
+            "analysis_type": analysis_type,
         }
+        findings = merged
+    result.update(
+        findings=findings,
+        chunks_scanned=state["chunks"],
+        chars_scanned=state["chars"],
+        failed_chunks=state["failed"],
+        stopped_early=state["stop"],
+    )
+    return result
+
+
+async def ascan_text(text: str, analysis_type: str = "general") -> Dict[str, Any]:
+    """ascan_document over an in-memory string."""
+    return await ascan_document(aiter_text(text), analysis_type)
+
 
 # Test function
 def test_fraud_detection():
@@ -0,0 +1,201 @@
+"""
+Local first-pass fraud screen that runs before the Groq LLM.
+
+Two signals are combined into one scam probability:
+- a single compiled regex over well-known scam phrasings (prize claims,
+  upfront fees, credential requests, guaranteed returns, gift-card payment),
+  where each matching rule adds a fixed log-odds weight;
+- a logistic-regression model over hashed word unigrams and bigrams. It is
+  trained on first use from the labelled examples in data/fraud_examples.jsonl,
+  which takes tens of milliseconds.
+
+Verdicts beyond the confidence thresholds are answered locally in
+microseconds, but a "scam" verdict also needs at least one matching rule.
+Everything else is "ambiguous" and goes to the LLM, or is reported as
+inconclusive when Groq is not configured. evaluate() checks the confident
+verdicts against the held-out messages in data/fraud_holdout.jsonl.
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+FRAUD_PRESCREEN = os.getenv("FRAUD_PRESCREEN", "1") not in ("0", "false", "False")
+FRAUD_PRESCREEN_SCAM_THRESHOLD = float(os.getenv("FRAUD_PRESCREEN_SCAM_THRESHOLD", "0.9"))
+FRAUD_PRESCREEN_BENIGN_THRESHOLD = float(os.getenv("FRAUD_PRESCREEN_BENIGN_THRESHOLD", "0.1"))
+EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "fraud_examples.jsonl")
+# Labelled messages kept out of training, for checking the confident verdicts
+HOLDOUT_PATH = os.path.join(os.path.dirname(__file__), "data", "fraud_holdout.jsonl")
+
+MODEL_NAME = "local-screen"
+_HASH_BITS = 18
+_EPOCHS = 40
+_LEARNING_RATE = 0.5
+_L2 = 1e-4
+
+# (pattern, log-odds weight, description shown in detected_content)
+_RULES: List[Tuple[str, float, str]] = [
+    (r"\b(?:you(?:'ve| have)? won|lucky winner|claim (?:your )?(?:prize|reward|inheritance))", 3.0, "prize or lottery claim"),
+    (r"\b(?:double|triple) your (?:money|bitcoin|crypto|investment)|\b\d+x (?:gains|returns)", 3.0, "promise to multiply money"),
+    (r"\bguarantee(?:d|s)? (?:\w+ ){0,2}(?:returns?|profits?|gains|income|approval)|\b(?:zero|no)[- ]risk\b", 2.5, "guaranteed returns or no-risk claim"),
+    (r"\b(?:processing|activation|registration|clearance|enrollment|delivery|upfront|membership) fee\b", 2.5, "upfront fee request"),
+    (r"\bgift ?cards?\b|\bitunes\b|\bwestern union\b|\bmoney ?gram\b", 2.5, "untraceable payment method"),
+    (r"\b(?:otp|one[- ]time (?:password|code)|verification code|cvv|pin number|(?:bank|online banking) (?:login|password))\b", 3.0, "request for credentials or codes"),
+    (r"\b(?:verify|confirm|update|unlock) (?:your )?(?:account|identity|payment information|kyc)\b", 2.0, "account verification prompt"),
+    (r"\baccount (?:has been |is |will be )?(?:suspended|locked|blocked|compromised|frozen|closed)|\bsuspended\b", 2.0, "account suspension threat"),
+    (r"\bclick (?:here|the link)|\bat this link\b|\bthrough this link\b", 1.5, "link-driven call to action"),
+    (r"\b(?:urgent(?:ly)?|act now|immediately|final warning|within 24 hours|limited (?:time|slots))\b", 1.0, "urgency pressure"),
+    (r"\b(?:wire|transfer) (?:me|the money|funds|your savings)|\bsend (?:me )?(?:\$|money|\d+ (?:btc|eth))", 1.5, "request to send money"),
+    (r"\b(?:get rich quick|passive income|recruit (?:your )?friends|money mule)\b", 2.0, "pyramid or money-mule scheme"),
+]
+_RULE_RE = re.compile("|".join(f"(?P<r{i}>{pattern})" for i, (pattern, _, _) in enumerate(_RULES)))
+_TOKEN_RE = re.compile(r"[a-z0-9$%']+")
+
+stats = {"screened": 0, "scam": 0, "benign": 0, "escalated": 0}
+
+_weights: Optional[Dict[int, float]] = None
+_bias = 0.0
+_lock = threading.Lock()
+
+
+def _features(text: str) -> Dict[int, float]:
+    """Hashed unigram + bigram indicators, scaled to unit length."""
+    tokens = _TOKEN_RE.findall(text)
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    if not grams:
+        return {}
+    mask = (1 << _HASH_BITS) - 1
+    value = 1.0 / math.sqrt(len(grams))
+    return {zlib.crc32(g.encode("utf-8")) & mask: value for g in grams}
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _load_examples(path: str) -> List[Tuple[str, int]]:
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"].lower(), 1 if row["label"] == "scam" else 0))
+    return examples
+
+
+def train(path: str = EXAMPLES_PATH) -> None:
+    """(Re)train the n-gram model with seeded SGD on the labelled examples."""
+    global _weights, _bias
+    data = [(_features(text), label) for text, label in _load_examples(path)]
+    rng = random.Random(0)
+    weights: Dict[int, float] = {}
+    bias = 0.0
+    for _ in range(_EPOCHS):
+        rng.shuffle(data)
+        for features, label in data:
+            z = bias + sum(weights.get(i, 0.0) * v for i, v in features.items())
+            error = _sigmoid(z) - label
+            bias -= _LEARNING_RATE * error
+            for i, v in features.items():
+                w = weights.get(i, 0.0)
+                weights[i] = w - _LEARNING_RATE * (error * v + _L2 * w)
+    _weights, _bias = weights, bias
+
+
+def _model() -> Tuple[Dict[int, float], float]:
+    if _weights is None:
+        with _lock:
+            if _weights is None:
+                train()
+    return _weights, _bias
+
+
+def score(text: str) -> Tuple[float, List[str]]:
+    """Scam probability for text and the descriptions of the rules it matched."""
+    lowered = (text or "").lower()
+    matched = sorted({int(m.lastgroup[1:]) for m in _RULE_RE.finditer(lowered)})
+    weights, bias = _model()
+    z = bias + sum(weights.get(i, 0.0) * v for i, v in _features(lowered).items())
+    z += sum(_RULES[i][1] for i in matched)
+    return _sigmoid(z), [_RULES[i][2] for i in matched]
+
+
+def _verdict(probability: float, signals: List[str]) -> str:
+    if probability >= FRAUD_PRESCREEN_SCAM_THRESHOLD and signals:
+        return "scam"
+    if probability <= FRAUD_PRESCREEN_BENIGN_THRESHOLD and not signals:
+        return "benign"
+    return "ambiguous"
+
+
+def screen(text: str) -> Dict:
+    """
+    Classify text locally
+
+    Returns:
+        Dictionary with verdict ("scam", "benign" or "ambiguous"), the scam
+        probability and the matched rule descriptions. "scam" also requires
+        that at least one rule matched, and "benign" that none did: the
+        n-gram model alone never decides a verdict.
+    """
+    probability, signals = score(text)
+    verdict = _verdict(probability, signals)
+    stats["screened"] += 1
+    stats["escalated" if verdict == "ambiguous" else verdict] += 1
+    return {"verdict": verdict, "probability": round(probability, 4), "signals": signals}
+
+
+def evaluate(path: str = HOLDOUT_PATH) -> Dict[str, int]:
+    """
+    Verdict counts on labelled examples, e.g. the held-out set. false_scam and
+    false_benign are confident verdicts that contradict the label.
+    """
+    counts = {"total": 0, "scam": 0, "benign": 0, "ambiguous": 0, "false_scam": 0, "false_benign": 0}
+    for text, label in _load_examples(path):
+        verdict = _verdict(*score(text))
+        counts["total"] += 1
+        counts[verdict] += 1
+        counts["false_scam"] += verdict == "scam" and label == 0
+        counts["false_benign"] += verdict == "benign" and label == 1
+    return counts
+
+
+def to_result(screened: Dict, analysis_type: str) -> Dict:
+    """Shape a screen() verdict like a fraud_detection result."""
+    if screened["verdict"] == "benign":
+        detected, message = "None", "No scam detected."
+    elif screened["verdict"] == "ambiguous":
+        # Only reached without Groq; the local screen is not sure either way
+        signals = ", ".join(screened["signals"])
+        detected = f"Inconclusive: possible warning signs ({signals})" if signals else "Inconclusive: no known scam patterns found"
+        message = (
+            "This message could not be fully analyzed. Be cautious with unexpected requests for money or "
+            "personal information, and verify them through the organization's official website or phone number."
+        )
+    else:
+        signals = ", ".join(screened["signals"]) or "wording typical of known scams"
+        detected = f"Likely scam ({screened['probability']:.0%} confidence): {signals}"
+        message = (
+            "This message shows common scam warning signs. Do not send money, gift cards, passwords or "
+            "verification codes, and contact the organization through its official website or phone number."
+        )
+    return {
+        "detected_content": detected,
+        "awareness_message": message,
+        "provider": "local",
+        "model": MODEL_NAME,
+        "success": True,
+        "analysis_type": analysis_type,
+        "scam_probability": screened["probability"],
+        "verdict": screened["verdict"],
+    }
@@ -0,0 +1,150 @@
+"""
+Continuous-batching inference worker for the local Granite model.
+
+Chat requests are queued and a single background task drains the queue into
+batches (bounded by INFERENCE_MAX_BATCH_SIZE and INFERENCE_MAX_WAIT_MS), runs
+one batched generate call per batch on a dedicated thread and resolves the
+awaiting coroutines with their individual results.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "8"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "25"))
+# Largest fraction of a batch that may be padding before it is split in two
+INFERENCE_MAX_PADDING_RATIO = float(os.getenv("INFERENCE_MAX_PADDING_RATIO", "0.5"))
+
+
+def _split_by_padding(items: List[Tuple[int, "_Pending"]], max_ratio: float) -> List[List["_Pending"]]:
+    """Group (length, pending) pairs so no group wastes more than max_ratio on padding."""
+    items = sorted(items, key=lambda x: x[0])
+    groups: List[List[_Pending]] = []
+    current: List[Tuple[int, _Pending]] = []
+    for length, pending in items:
+        candidate = current + [(length, pending)]
+        longest = length  # items are sorted, so the newest is the longest
+        padded = longest * len(candidate)
+        wasted = padded - sum(l for l, _ in candidate)
+        if current and padded > 0 and wasted / padded > max_ratio:
+            groups.append([p for _, p in current])
+            current = [(length, pending)]
+        else:
+            current = candidate
+    if current:
+        groups.append([p for _, p in current])
+    return groups
+
+
+class _Pending:
+    __slots__ = ("prompt", "future")
+
+    def __init__(self, prompt: str, future: asyncio.Future):
+        self.prompt = prompt
+        self.future = future
+
+
+class InferenceWorker:
+    """Queues prompts and serves them through batched generate calls."""
+
+    def __init__(
+        self,
+        generate_batch: Callable[[List[str]], List[str]],
+        length_fn: Optional[Callable[[str], int]] = None,
+        max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        max_padding_ratio: float = INFERENCE_MAX_PADDING_RATIO,
+    ):
+        self._generate_batch = generate_batch
+        self._length_fn = length_fn or len
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_padding_ratio = max_padding_ratio
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # One thread: generate calls are CPU-bound and must not contend with each other
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="granite-inference")
+        self.stats = {"requests": 0, "batches": 0, "max_batch": 0, "busy_seconds": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                pending = self._queue.get_nowait()
+                if not pending.future.done():
+                    pending.future.set_exception(RuntimeError("Inference worker stopped"))
+        self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="granite-inference")
+
+    async def submit(self, prompt: str) -> str:
+        """Queue a prompt and wait for its generated text."""
+        if not self.running:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Pending(prompt, future))
+        return await future
+
+    def execute(self, fn: Callable, *args) -> asyncio.Future:
+        """Run fn on the inference thread, serialized with the batched generate calls."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _collect(self) -> List[_Pending]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Drop requests whose callers already gave up
+        return [p for p in batch if not p.future.done()]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            sized = [(self._length_fn(p.prompt), p) for p in batch]
+            for group in _split_by_padding(sized, self.max_padding_ratio):
+                prompts = [p.prompt for p in group]
+                started = time.perf_counter()
+                try:
+                    results = await loop.run_in_executor(self._executor, self._generate_batch, prompts)
+                    if len(results) != len(group):
+                        raise RuntimeError(f"generate_batch returned {len(results)} results for {len(group)} prompts")
+                except Exception as e:
+                    for p in group:
+                        if not p.future.done():
+                            p.future.set_exception(e)
+                    continue
+                finally:
+                    self.stats["busy_seconds"] += time.perf_counter() - started
+                self.stats["requests"] += len(group)
+                self.stats["batches"] += 1
+                self.stats["max_batch"] = max(self.stats["max_batch"], len(group))
+                for p, text in zip(group, results):
+                    if not p.future.done():
+                        p.future.set_result(text)
@@ -1,13 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .schemas import ChatRequest, ChatResponse, SessionCreate, Session, SessionList, Message, FraudDetectionRequest, FraudDetectionResponse
-from .service import generate_chat_response
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from .schemas import ChatRequest, ChatResponse, SessionCreate, Session, SessionList, Message, MessageAppend, MessageAppendResult, MessagePage, FraudDetectionRequest, FraudDetectionResponse, FraudScanResponse, FraudBatchRequest, FraudBatchResult, FraudBatchResponse
+from .service import agenerate_chat_response, astream_chat_response, inference_worker, chat_cache, prefix_cache_stats, hedge_stats, CHAT_HEDGE_AFTER_MS, warm_start, model_status, MODEL_EAGER_LOAD
 from .finance import BudgetInput, BudgetAnalysis, analyze_budget, SavingsInput, SavingsProjection, project_savings, InvestInput, InvestOutput, invest_calculate
-from .fraud_detection import detect_fraud, analyze_financial_content
-from .storage import create_session, list_sessions, get_session, update_session_messages
+from .finance_batch import BudgetBatchInput, BudgetBatchAnalysis, analyze_budget_batch, SavingsBatchInput, SavingsBatchProjection, project_savings_batch, InvestBatchInput, InvestBatchOutput, invest_calculate_batch
+from .simulation import SimulationInput, SimulationOutput, simulate
+from .projection import SavingsSeriesInput, InvestmentSeriesInput, DebtSeriesInput, ProjectionSeries, savings_series, investment_series, debt_series, encode_columns
+from .fraud_detection import adetect_fraud, aanalyze_financial_content, adetect_fraud_batch, ascan_document, ascan_text, adecode, FRAUD_BATCH_MAX_ITEMS, FRAUD_SCAN_CHUNK_CHARS, parse_stats as fraud_parse_stats, fraud_cache, save_cache as save_fraud_cache, FRAUD_CACHE_PATH
+from .fraud_screen import FRAUD_PRESCREEN, FRAUD_PRESCREEN_SCAM_THRESHOLD, FRAUD_PRESCREEN_BENIGN_THRESHOLD, stats as prescreen_stats
+from .speech import TranscribeResponse, TTSRequest, TTSResponse, acall_deepgram, acall_elevenlabs
+from .providers import aclose_all, provider_stats
+from .metrics import latency
+from .storage import create_session, list_sessions, get_session, update_session_messages, append_messages, get_messages, flush as flush_sessions
+from contextlib import asynccontextmanager
+import asyncio
+import base64
+import json
 import os
 
-app = FastAPI(title="Finance Chatbot API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    inference_worker.start()
+    warmup = asyncio.create_task(warm_start()) if MODEL_EAGER_LOAD else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await inference_worker.stop()
+    await aclose_all()
+    flush_sessions()
+    save_fraud_cache()
+
+
+app = FastAPI(title="Finance Chatbot API", version="0.1.0", lifespan=lifespan)
 
 # CORS
 allowed_origins = os.getenv("ALLOW_ORIGINS", "http://localhost:5173").split(",")
@@ -17,43 +46,96 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Projection-Meta"],
 )
 
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/api/ready")
+def ready():
+    """
+    Readiness probe. Returns 503 while the model is still loading or warming up,
+    and 200 once it is ready or has settled into fallback mode (failed/unavailable).
+    """
+    body = dict(model_status)
+    body["ready"] = body["status"] in ("ready", "failed", "unavailable")
+    if MODEL_EAGER_LOAD and not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/api/inference/stats")
+def inference_stats():
+    return {"running": inference_worker.running, **inference_worker.stats, "prefix_cache": prefix_cache_stats}
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest):
     """
     Chat endpoint with extended timeout for AI model processing
-    First request may take 5-10 minutes due to model loading
-    """
-    import asyncio
-
-    # Run the chat generation in a thread to avoid blocking
-    def generate_response():
-        return generate_chat_response(req)
+    The model is loaded at startup (see /api/ready); with MODEL_EAGER_LOAD=0
+    the first request may take 5-10 minutes due to model loading
 
-    # Extended timeout for AI model processing
+    Granite generation is queued on the shared inference worker, which batches
+    concurrent chats into a single generate call.
+    """
     try:
-        text, meta = await asyncio.get_event_loop().run_in_executor(None, generate_response)
-        return ChatResponse(response=text, provider=meta.get("provider", "unknown"), used_fallback=meta.get("used_fallback", False))
+        text, meta = await agenerate_chat_response(req)
+        return ChatResponse(response=text, provider=meta.get("provider", "unknown"), used_fallback=meta.get("used_fallback", False), cached=meta.get("cached", False))
     except Exception as e:
         # Fallback response if model fails
         fallback_text = "I'm currently loading the AI model. This may take a few minutes on the first request. Please try again shortly, or I can provide some general financial advice in the meantime."
         return ChatResponse(response=fallback_text, provider="fallback", used_fallback=True)
 
-# Sessions endpoints (JSON storage)
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Server-sent events variant of /api/chat.
+    Emits `data: {"token": ...}` events as text is generated and finishes with
+    `event: done` carrying the provider, used_fallback and cached flags.
+    """
+    async def events():
+        try:
+            async for event in astream_chat_response(req):
+                if event.get("done"):
+                    meta = {"provider": event["provider"], "used_fallback": event["used_fallback"], "cached": event.get("cached", False)}
+                    yield f"event: done\ndata: {json.dumps(meta)}\n\n"
+                else:
+                    yield f"data: {json.dumps({'token': event['token']})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/chat/latency")
+def chat_latency():
+    """Per-provider latency histograms, used to tune CHAT_HEDGE_AFTER_MS."""
+    return {"hedge_after_ms": CHAT_HEDGE_AFTER_MS, "hedging": hedge_stats, "providers": latency.snapshot()}
+
+@app.get("/api/chat/cache/stats")
+def chat_cache_stats():
+    return chat_cache.stats()
+
+@app.delete("/api/chat/cache")
+def chat_cache_clear():
+    chat_cache.clear()
+    return {"cleared": True}
+
+# Sessions endpoints (SQLite storage by default, see storage.SESSIONS_BACKEND)
 @app.post("/api/sessions", response_model=Session)
 def create_session_ep(payload: SessionCreate):
     s = create_session(payload.title)
     return Session(**s)
 
 @app.get("/api/sessions", response_model=SessionList)
-def list_sessions_ep():
-    sessions = [Session(**s) for s in list_sessions()]
-    return {"sessions": sessions}
+def list_sessions_ep(limit: int = Query(50, ge=1, le=500), after: str | None = None):
+    sessions = [Session(**s) for s in list_sessions(limit, after)]
+    next_cursor = sessions[-1].id if len(sessions) == limit else None
+    return {"sessions": sessions, "next_cursor": next_cursor}
 
 @app.get("/api/sessions/{sid}", response_model=Session)
 def get_session_ep(sid: str):
@@ -67,6 +149,32 @@ def update_session_ep(sid: str, messages: list[Message]):
     s = update_session_messages(sid, [m.model_dump() for m in messages])
     return Session(**s) if s else Session(id=sid, title="Not found", created_at="", messages=[])
 
+@app.post("/api/sessions/{sid}/messages", response_model=MessageAppendResult)
+def append_messages_ep(sid: str, payload: MessageAppend):
+    """Append messages to a session without resending the conversation."""
+    count = append_messages(sid, [m.model_dump() for m in payload.messages])
+    if count is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return MessageAppendResult(session_id=sid, message_count=count)
+
+@app.get("/api/sessions/{sid}/messages", response_model=MessagePage)
+def get_messages_ep(
+    sid: str,
+    limit: int = Query(50, ge=1, le=500),
+    after: int | None = Query(None, ge=-1),
+    before: int | None = Query(None, ge=0),
+):
+    """
+    Page through a session's messages by position. Use `after` to read forward,
+    `before` to load earlier messages; with neither, the first page is returned.
+    """
+    messages = get_messages(sid, limit, after, before)
+    if messages is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    next_cursor = messages[-1]["position"] if len(messages) == limit else None
+    prev_cursor = messages[0]["position"] if messages and messages[0]["position"] > 0 else None
+    return MessagePage(session_id=sid, messages=messages, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
 # Finance endpoints
 @app.post("/api/budget/analyze", response_model=BudgetAnalysis)
 def budget_analyze(payload: BudgetInput):
@@ -80,24 +188,171 @@ def savings_project(payload: SavingsInput):
 def invest_calc(payload: InvestInput):
     return invest_calculate(payload)
 
+@app.post("/api/invest/simulate", response_model=SimulationOutput)
+async def invest_simulate(payload: SimulationInput):
+    """
+    Monte Carlo projection: percentile bands of the balance at each year end and,
+    with target_amount, the share of paths that end at or above it. Pass `seed`
+    for reproducible results.
+    """
+    try:
+        return await run_in_threadpool(simulate, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+# Projection series. format=json returns columns as JSON lists; f32/f64 return the
+# columns as raw little-endian float arrays, with everything else in X-Projection-Meta.
+def _projection(compute, payload, format: str):
+    try:
+        series = compute(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if format == "json":
+        return series
+    meta = series.model_dump(exclude={"columns"})
+    meta.update(columns=list(series.columns), rows=len(series.columns["month"]), dtype=format)
+    return Response(content=encode_columns(series, format), media_type="application/octet-stream", headers={"X-Projection-Meta": json.dumps(meta)})
+
+@app.post("/api/projection/savings", response_model=ProjectionSeries)
+def projection_savings(payload: SavingsSeriesInput, format: str = Query("json", pattern="^(json|f32|f64)$")):
+    return _projection(savings_series, payload, format)
+
+@app.post("/api/projection/investment", response_model=ProjectionSeries)
+def projection_investment(payload: InvestmentSeriesInput, format: str = Query("json", pattern="^(json|f32|f64)$")):
+    return _projection(investment_series, payload, format)
+
+@app.post("/api/projection/debt", response_model=ProjectionSeries)
+def projection_debt(payload: DebtSeriesInput, format: str = Query("json", pattern="^(json|f32|f64)$")):
+    return _projection(debt_series, payload, format)
+
+# Columnar batch variants: one list per field, one element per scenario.
+# Bodies are parsed and responses serialized by pydantic-core directly; the
+# generic json.loads/json.dumps path costs several times the calculation itself
+# at 100k scenarios.
+async def _columnar(request: Request, model, compute) -> Response:
+    body = await request.body()
+
+    def run() -> str:
+        return compute(model.model_validate_json(body)).model_dump_json()
+
+    try:
+        content = await run_in_threadpool(run)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+def _body_schema(model) -> dict:
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
+
+@app.post("/api/budget/analyze/batch", response_model=BudgetBatchAnalysis, openapi_extra=_body_schema(BudgetBatchInput))
+async def budget_analyze_batch(request: Request):
+    return await _columnar(request, BudgetBatchInput, analyze_budget_batch)
+
+@app.post("/api/savings/project/batch", response_model=SavingsBatchProjection, openapi_extra=_body_schema(SavingsBatchInput))
+async def savings_project_batch(request: Request):
+    return await _columnar(request, SavingsBatchInput, project_savings_batch)
+
+@app.post("/api/invest/calc/batch", response_model=InvestBatchOutput, openapi_extra=_body_schema(InvestBatchInput))
+async def invest_calc_batch(request: Request):
+    return await _columnar(request, InvestBatchInput, invest_calculate_batch)
+
 # Fraud Detection endpoints
 @app.post("/api/fraud/detect", response_model=FraudDetectionResponse)
-def detect_fraud_content(request: FraudDetectionRequest):
+async def detect_fraud_content(request: FraudDetectionRequest):
     """
     Detect fraud/scam content in text using FraudAwarenessGPT
+
+    Content longer than FRAUD_SCAN_CHUNK_CHARS is scanned in chunks (see
+    /api/fraud/scan) instead of being sent to the model in one prompt.
     """
-    if request.analysis_type == "financial":
-        result = analyze_financial_content(request.content)
+    if len(request.content) > FRAUD_SCAN_CHUNK_CHARS:
+        result = await ascan_text(request.content, request.analysis_type)
+    elif request.analysis_type == "financial":
+        result = await aanalyze_financial_content(request.content)
     else:
-        result = detect_fraud(request.content)
+        result = await adetect_fraud(request.content)
 
     return FraudDetectionResponse(**result)
 
+@app.post("/api/fraud/scan", response_model=FraudScanResponse)
+async def scan_fraud_document(request: Request, analysis_type: str = Query("general")):
+    """
+    Scan a long document sent as the raw (UTF-8 text) request body
+
+    The body is read incrementally and cut into overlapping chunks that are
+    analyzed concurrently; the scan stops at the first confident scam finding.
+    Findings carry the character offsets of the chunk they were found in.
+    """
+    result = await ascan_document(adecode(request.stream()), analysis_type)
+    return FraudScanResponse(**result)
+
+@app.post("/api/fraud/detect/batch", response_model=FraudBatchResponse)
+async def detect_fraud_batch(request: FraudBatchRequest):
+    """
+    Analyze up to FRAUD_BATCH_MAX_ITEMS texts in one call
+
+    Duplicate texts are analyzed once and calls fan out with bounded
+    concurrency. Results come back in input order; items that could not be
+    analyzed have success=false and are counted in `failed`.
+    """
+    if len(request.items) > FRAUD_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(request.items)} items (max {FRAUD_BATCH_MAX_ITEMS})")
+    results = await adetect_fraud_batch([(item.content, item.analysis_type) for item in request.items])
+    succeeded = sum(1 for r in results if r["success"])
+    return FraudBatchResponse(
+        results=[FraudBatchResult(index=i, id=item.id, **r) for i, (item, r) in enumerate(zip(request.items, results))],
+        total=len(results),
+        unique=len({(r["analysis_type"], item.content) for item, r in zip(request.items, results)}),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
 @app.post("/api/fraud/analyze-financial", response_model=FraudDetectionResponse)
-def analyze_financial_fraud(request: FraudDetectionRequest):
+async def analyze_financial_fraud(request: FraudDetectionRequest):
     """
     Specialized financial fraud detection for investment scams, phishing, etc.
     """
-    result = analyze_financial_content(request.content)
+    result = await aanalyze_financial_content(request.content)
     return FraudDetectionResponse(**result)
 
+@app.get("/api/fraud/stats")
+def fraud_stats():
+    return {
+        "prescreen": {
+            "enabled": FRAUD_PRESCREEN,
+            "scam_threshold": FRAUD_PRESCREEN_SCAM_THRESHOLD,
+            "benign_threshold": FRAUD_PRESCREEN_BENIGN_THRESHOLD,
+            **prescreen_stats,
+        },
+        "cache": {**fraud_cache.stats(), "path": FRAUD_CACHE_PATH or None},
+        "parsing": fraud_parse_stats,
+    }
+
+@app.delete("/api/fraud/cache")
+def fraud_cache_clear():
+    fraud_cache.clear()
+    return {"cleared": True}
+
+# Speech endpoints
+@app.post("/api/speech/transcribe", response_model=TranscribeResponse)
+async def speech_transcribe(file: UploadFile = File(...)):
+    audio = await file.read()
+    try:
+        text = await acall_deepgram(audio, file.content_type)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Transcription failed: {e}")
+    return TranscribeResponse(text=text)
+
+@app.post("/api/speech/tts", response_model=TTSResponse)
+async def speech_tts(payload: TTSRequest):
+    try:
+        audio = await acall_elevenlabs(payload.text)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Text-to-speech failed: {e}")
+    return TTSResponse(audio_base64=base64.b64encode(audio).decode("ascii"))
+
+@app.get("/api/providers/stats")
+def providers_stats():
+    return provider_stats()
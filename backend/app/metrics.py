@@ -0,0 +1,80 @@
+"""
+Lightweight in-process metrics: fixed-bucket latency histograms keyed by name.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Optional
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+DEFAULT_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with bucket-interpolated percentiles."""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0..1) in milliseconds, interpolated within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets_ms[i - 1] if i > 0 else 0.0
+                high = min(self.buckets_ms[i], self.max_ms) if i < len(self.buckets_ms) else self.max_ms
+                return round(low + (high - low) * ((rank - seen) / n), 1)
+            seen += n
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> Dict:
+        labels: List[str] = [f"le_{b}" for b in self.buckets_ms] + ["inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class HistogramRegistry:
+    """Named histograms created on first use."""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float) -> None:
+        self.get(name).observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+
+latency = HistogramRegistry()
@@ -0,0 +1,88 @@
+"""
+Process-wide, reference-counted handle on the shared Granite model.
+
+For callers that live in the same process as many independent users, such as
+the Streamlit app with one script session per browser tab. Each user holds a
+lease. The model is loaded once through service._load_model, on first acquire,
+and shared by every lease. It is unloaded explicitly with unload(), or
+automatically when the last lease goes away if MODEL_UNLOAD_WHEN_UNUSED is set.
+A lease that is never released explicitly is released when it is
+garbage-collected, e.g. when Streamlit drops an expired session's state.
+"""
+
+import os
+import threading
+import weakref
+from typing import Dict
+
+from . import service
+
+MODEL_UNLOAD_WHEN_UNUSED = os.getenv("MODEL_UNLOAD_WHEN_UNUSED", "0").lower() not in ("0", "false", "no")
+
+
+class ModelLease:
+    """One user's claim on the shared model; release() is idempotent."""
+
+    def __init__(self, registry: "ModelRegistry"):
+        self._finalizer = weakref.finalize(self, registry._release)
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def release(self) -> None:
+        self._finalizer()
+
+
+class ModelRegistry:
+    def __init__(self, unload_when_unused: bool = MODEL_UNLOAD_WHEN_UNUSED):
+        self.unload_when_unused = unload_when_unused
+        self._refs = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return service._model is not None
+
+    @property
+    def model(self):
+        return service._model
+
+    @property
+    def tokenizer(self):
+        return service._tokenizer
+
+    def acquire(self) -> ModelLease:
+        """
+        Take a lease and make sure the model is loaded. Blocks while another
+        caller is loading it; a failed load leaves the lease valid and is
+        retried (with the service's back-off) by the next acquire() or load().
+        """
+        with self._lock:
+            self._refs += 1
+        lease = ModelLease(self)
+        self.load()
+        return lease
+
+    def load(self) -> bool:
+        return service._load_model()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._refs = max(0, self._refs - 1)
+            idle = self._refs == 0
+        if idle and self.unload_when_unused:
+            self.unload()
+
+    def unload(self, force: bool = False) -> bool:
+        """Free the model; refused while leases are outstanding unless force=True."""
+        with self._lock:
+            if self._refs and not force:
+                return False
+        return service.unload_model()
+
+    def stats(self) -> Dict:
+        return {"refs": self._refs, "unload_when_unused": self.unload_when_unused, **service.model_status}
+
+
+registry = ModelRegistry()
@@ -0,0 +1,144 @@
+"""
+Month-by-month projection series for savings, investment growth and debt payoff.
+
+Every series is evaluated in closed form for all months at once, e.g.
+B_k = B_0 (1+r)^k + c ((1+r)^k - 1) / r, so there is no per-month Python loop.
+Long horizons can be downsampled to at most max_points points. The first and
+last month are always kept, and so is the month the goal is reached or the
+debt is paid off.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+PROJECTION_MAX_MONTHS = int(os.getenv("PROJECTION_MAX_MONTHS", "1200"))
+
+_BINARY_DTYPES = {"f32": "<f4", "f64": "<f8"}
+
+
+class SavingsSeriesInput(BaseModel):
+    current_amount: float
+    monthly_contribution: float
+    target_amount: Optional[float] = None  # balances are capped here, as in project_savings
+    annual_interest_pct: float = 0.0
+    months: int = 12
+    max_points: Optional[int] = None
+
+class InvestmentSeriesInput(BaseModel):
+    initial_investment: float
+    monthly_investment: float
+    annual_return_pct: float
+    months: int = 120
+    max_points: Optional[int] = None
+
+class DebtSeriesInput(BaseModel):
+    balance: float
+    annual_interest_pct: float
+    monthly_payment: float
+    months: int = 360
+    max_points: Optional[int] = None
+
+class ProjectionSeries(BaseModel):
+    kind: str
+    event_month: Optional[int] = None  # goal reached (savings) or paid off (debt)
+    total_contributed: float  # contributions or payments over the whole horizon
+    total_interest: float  # interest earned, or paid on debt
+    columns: Dict[str, list]  # month, balance, contributed, interest
+
+
+def _growth(rate: float, k: np.ndarray):
+    """(1+r)^k and the annuity factor ((1+r)^k - 1) / r, which is k at r = 0."""
+    compound = np.power(1.0 + rate, k)
+    annuity = (compound - 1.0) / rate if rate else k.astype(np.float64)
+    return compound, annuity
+
+
+def _downsample(n_rows: int, max_points: Optional[int], keep: Optional[int]) -> np.ndarray:
+    if not max_points or n_rows <= max_points:
+        return np.arange(n_rows)
+    index = np.unique(np.linspace(0, n_rows - 1, max(2, max_points)).round().astype(np.int64))
+    if keep is not None:
+        index = np.union1d(index, [keep])
+    return index
+
+
+def _series(kind: str, balance: np.ndarray, contributed: np.ndarray, interest: np.ndarray, event: Optional[int], max_points: Optional[int]) -> ProjectionSeries:
+    index = _downsample(len(balance), max_points, event)
+    return ProjectionSeries(
+        kind=kind,
+        event_month=event,
+        total_contributed=round(float(contributed[-1]), 2),
+        total_interest=round(float(interest[-1]), 2),
+        columns={
+            "month": index.tolist(),
+            "balance": np.round(balance[index], 2).tolist(),
+            "contributed": np.round(contributed[index], 2).tolist(),
+            "interest": np.round(interest[index], 2).tolist(),
+        },
+    )
+
+
+def _months(months: int) -> np.ndarray:
+    if not 1 <= months <= PROJECTION_MAX_MONTHS:
+        raise ValueError(f"months must be between 1 and {PROJECTION_MAX_MONTHS}")
+    return np.arange(months + 1)
+
+
+def savings_series(data: SavingsSeriesInput) -> ProjectionSeries:
+    k = _months(data.months)
+    compound, annuity = _growth(data.annual_interest_pct / 100.0 / 12.0, k)
+    balance = data.current_amount * compound + data.monthly_contribution * annuity
+    contributed = data.monthly_contribution * k.astype(np.float64)
+    event = None
+    if data.target_amount is not None:
+        reached = np.flatnonzero(balance >= data.target_amount)
+        event = int(reached[0]) if len(reached) else None
+        balance = np.minimum(balance, data.target_amount)
+        if event is not None:
+            # Contributions stop once the goal is reached
+            contributed = np.minimum(contributed, contributed[event])
+    interest = balance - data.current_amount - contributed
+    return _series("savings", balance, contributed, interest, event, data.max_points)
+
+
+def investment_series(data: InvestmentSeriesInput) -> ProjectionSeries:
+    k = _months(data.months)
+    annual_rate = data.annual_return_pct / 100.0
+    # Same conventions as invest_calculate: annual compounding on the initial
+    # amount, monthly compounding on contributions; equal at whole years
+    initial = data.initial_investment * np.power(1.0 + annual_rate, k / 12.0)
+    _, annuity = _growth(annual_rate / 12.0, k)
+    balance = initial + data.monthly_investment * annuity
+    contributed = data.monthly_investment * k.astype(np.float64)
+    interest = balance - data.initial_investment - contributed
+    return _series("investment", balance, contributed, interest, None, data.max_points)
+
+
+def debt_series(data: DebtSeriesInput) -> ProjectionSeries:
+    k = _months(data.months)
+    compound, annuity = _growth(data.annual_interest_pct / 100.0 / 12.0, k)
+    unclipped = data.balance * compound - data.monthly_payment * annuity
+    paid_off = np.flatnonzero(unclipped <= 0)
+    event = int(paid_off[0]) if len(paid_off) and data.balance > 0 else None
+    balance = np.maximum(unclipped, 0.0)
+    payments = np.full(len(k), data.monthly_payment)
+    payments[0] = 0.0
+    if event is not None:
+        # The final payment only clears what is left; nothing is paid afterwards
+        payments[event] = data.monthly_payment + unclipped[event]
+        payments[event + 1:] = 0.0
+    paid = np.cumsum(payments)
+    interest = paid - (data.balance - balance)
+    return _series("debt", balance, paid, interest, event, data.max_points)
+
+
+def encode_columns(series: ProjectionSeries, dtype: str = "f32") -> bytes:
+    """
+    Columns as one little-endian float array per column, in the order of
+    series.columns, e.g. for Float32Array in the browser. As f32 this is about
+    half the size of the JSON columns.
+    """
+    return b"".join(np.asarray(values, dtype=_BINARY_DTYPES[dtype]).tobytes() for values in series.columns.values())
@@ -0,0 +1,141 @@
+"""
+Shared HTTP clients for external providers (Gemini, Groq, Deepgram, ElevenLabs).
+
+Each provider gets one keep-alive connection pool, a concurrency limit, a
+timeout and retries for transient failures. Async code uses get_client();
+the remaining sync call sites use sync_session(), which pools connections
+the same way through requests.
+
+Per-provider settings can be overridden with <PROVIDER>_MAX_CONCURRENCY,
+<PROVIDER>_TIMEOUT_SECONDS and <PROVIDER>_MAX_RETRIES, e.g. GEMINI_MAX_RETRIES=3.
+"""
+
+import asyncio
+import os
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_DEFAULTS = {
+    "gemini": {"max_concurrency": 16, "timeout_seconds": 30.0, "max_retries": 2},
+    "groq": {"max_concurrency": 16, "timeout_seconds": 30.0, "max_retries": 2},
+    "deepgram": {"max_concurrency": 8, "timeout_seconds": 60.0, "max_retries": 1},
+    "elevenlabs": {"max_concurrency": 4, "timeout_seconds": 60.0, "max_retries": 1},
+}
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+RETRY_BACKOFF_SECONDS = float(os.getenv("PROVIDER_RETRY_BACKOFF_SECONDS", "0.5"))
+
+
+def provider_setting(provider: str, key: str):
+    """Setting for a provider, overridable via <PROVIDER>_<KEY> in the environment."""
+    default = _DEFAULTS.get(provider, _DEFAULTS["gemini"])[key]
+    return type(default)(os.getenv(f"{provider.upper()}_{key.upper()}", default))
+
+
+class ProviderClient:
+    """Pooled async HTTP client for one provider, with a concurrency cap and retries."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.max_concurrency = provider_setting(name, "max_concurrency")
+        self.timeout_seconds = provider_setting(name, "timeout_seconds")
+        self.max_retries = provider_setting(name, "max_retries")
+        self.http = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self.limit = asyncio.Semaphore(self.max_concurrency)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _backoff(self, attempt: int) -> float:
+        return RETRY_BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random())
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transport errors and retryable statuses."""
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            self.stats["requests"] += 1
+            try:
+                async with self.limit:
+                    response = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if last:
+                    self.stats["failures"] += 1
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or last:
+                    if response.is_error:
+                        self.stats["failures"] += 1
+                    response.raise_for_status()
+                    return response
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Streamed request; not retried, since the body may already be partly consumed."""
+        self.stats["requests"] += 1
+        async with self.limit:
+            async with self.http.stream(method, url, **kwargs) as response:
+                if response.is_error:
+                    self.stats["failures"] += 1
+                response.raise_for_status()
+                yield response
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+
+_clients: Dict[str, ProviderClient] = {}
+_sessions: Dict[str, requests.Session] = {}
+
+
+def get_client(provider: str) -> ProviderClient:
+    client = _clients.get(provider)
+    if client is None:
+        client = _clients[provider] = ProviderClient(provider)
+    return client
+
+
+def sync_session(provider: str) -> requests.Session:
+    """Pooled requests.Session for code paths that are still synchronous."""
+    session = _sessions.get(provider)
+    if session is None:
+        size = provider_setting(provider, "max_concurrency")
+        retry = Retry(
+            total=provider_setting(provider, "max_retries"),
+            backoff_factor=RETRY_BACKOFF_SECONDS,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _sessions[provider] = session
+    return session
+
+
+def provider_stats() -> Dict[str, Dict]:
+    return {
+        name: {**client.stats, "max_concurrency": client.max_concurrency, "in_flight": client.max_concurrency - client.limit._value}
+        for name, client in _clients.items()
+    }
+
+
+async def aclose_all() -> None:
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+    for session in list(_sessions.values()):
+        session.close()
+    _sessions.clear()
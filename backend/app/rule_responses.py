@@ -0,0 +1,80 @@
+"""
+Rule-based answers for when no model is available.
+
+The catalog in data/rule_responses.json is loaded once at import. Each topic
+has weighted trigger keywords and one answer per user mode. An inverted index
+maps every keyword to the topics it scores for, and a single precompiled
+alternation over all keywords finds them in one scan of the lowercased
+question. Keywords match at the start of a word and may carry a common suffix,
+so "invest" also matches "investing" and "investments". The answer comes from
+the highest-scoring topic that has one for the user's mode, with ties going
+to the topic listed first.
+
+Shared by the backend's fallback path and the Streamlit app.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "rule_responses.json")
+
+MODE_EMOJI = {"student": "🎓", "professional": "💼"}
+
+
+def _load(path: str = CATALOG_PATH):
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    topics = catalog["topics"]
+    index: Dict[str, List[Tuple[int, float]]] = {}
+    for i, topic in enumerate(topics):
+        for keyword, weight in topic["keywords"].items():
+            index.setdefault(keyword, []).append((i, float(weight)))
+    # Longest keywords first so "save money" wins over "save"
+    alternation = "|".join(re.escape(k) for k in sorted(index, key=len, reverse=True))
+    pattern = re.compile(rf"(?<!\w)({alternation})(?:s|es|d|ed|ing|ment|ments)?\b")
+    return topics, catalog["default"], index, pattern
+
+
+_topics, _default, _index, _KEYWORD_RE = _load()
+
+
+def _totals(text: str, user_mode: Optional[str] = None) -> Dict[int, float]:
+    totals: Dict[int, float] = {}
+    for keyword in set(_KEYWORD_RE.findall(text.lower())):
+        for i, weight in _index[keyword]:
+            if user_mode is None or user_mode in _topics[i]:
+                totals[i] = totals.get(i, 0.0) + weight
+    return totals
+
+
+def scores(text: str) -> Dict[str, float]:
+    """Topic -> score for text; topics without a matching keyword are left out."""
+    return {_topics[i]["topic"]: score for i, score in sorted(_totals(text).items())}
+
+
+def match(text: str, user_mode: str) -> Optional[Dict]:
+    """The {"title", "advice", "points"} answer of the best topic, or None if nothing matches."""
+    totals = _totals(text, user_mode)
+    if not totals:
+        return None
+    best = max(totals, key=lambda i: (totals[i], -i))
+    return _topics[best][user_mode]
+
+
+def render(answer: Dict, user_mode: str, amount: Optional[float] = None, tip: str = "") -> str:
+    """Markdown for one catalog answer, with an optional amount in focus and closing tip."""
+    text = f"{MODE_EMOJI.get(user_mode, '💰')} **{answer['title']}**\n\n"
+    if amount is not None:
+        text += f"💰 **Amount Focus:** ${amount:,.2f}\n\n"
+    text += f"**Key Insight:** {answer['advice']}\n\n**Actionable Steps:**\n"
+    text += "".join(f"{i}. {point}\n" for i, point in enumerate(answer["points"], 1))
+    if tip:
+        text += f"\n💡 **Pro Tip:** {tip}\n"
+    return text
+
+
+def answer(text: str, user_mode: str, amount: Optional[float] = None) -> str:
+    """Rendered answer for text, or the general fundamentals answer if no topic matches."""
+    return render(match(text, user_mode) or _default, user_mode, amount)
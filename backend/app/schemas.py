@@ -5,16 +5,34 @@ class ChatRequest(BaseModel):
     user_input: str
     scenario_context: Optional[str] = ""
     user_mode: Optional[str] = "professional"  # 'student' or 'professional'
+    bypass_cache: Optional[bool] = False  # skip the response cache lookup for this request
 
 class ChatResponse(BaseModel):
     response: str
     provider: str
     used_fallback: bool = False
+    cached: bool = False
 
 class Message(BaseModel):
     role: str
     content: str
 
+class IndexedMessage(Message):
+    position: int
+
+class MessageAppend(BaseModel):
+    messages: List[Message]
+
+class MessageAppendResult(BaseModel):
+    session_id: str
+    message_count: int
+
+class MessagePage(BaseModel):
+    session_id: str
+    messages: List[IndexedMessage]
+    next_cursor: Optional[int] = None  # pass as `after` to continue forward
+    prev_cursor: Optional[int] = None  # pass as `before` to load earlier messages
+
 class SessionCreate(BaseModel):
     title: Optional[str] = None
 
@@ -26,6 +44,7 @@ class Session(BaseModel):
 
 class SessionList(BaseModel):
     sessions: List[Session]
+    next_cursor: Optional[str] = None  # pass as `after` to fetch the next page
 
 class FraudDetectionRequest(BaseModel):
     content: str
@@ -38,3 +57,37 @@ class FraudDetectionResponse(BaseModel):
     model: str
     success: bool
     analysis_type: str = "general"
+    cached: bool = False
+
+class FraudFinding(BaseModel):
+    start: int  # character offsets of the chunk the finding came from
+    end: int
+    detected_content: str
+    awareness_message: str
+    provider: str
+
+class FraudScanResponse(FraudDetectionResponse):
+    findings: List[FraudFinding] = []
+    chunks_scanned: int = 0
+    chars_scanned: int = 0
+    failed_chunks: int = 0
+    stopped_early: bool = False
+
+class FraudBatchItem(BaseModel):
+    id: Optional[str] = None  # caller's reference, echoed back in the result
+    content: str
+    analysis_type: str = "general"
+
+class FraudBatchRequest(BaseModel):
+    items: List[FraudBatchItem]
+
+class FraudBatchResult(FraudDetectionResponse):
+    index: int
+    id: Optional[str] = None
+
+class FraudBatchResponse(BaseModel):
+    results: List[FraudBatchResult]
+    total: int
+    unique: int
+    succeeded: int
+    failed: int
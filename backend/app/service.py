@@ -1,5 +1,18 @@
 import os
-from typing import Tuple, Dict
+import gc
+import copy
+import json
+import time
+import asyncio
+import threading
+from typing import Tuple, Dict, List, Iterator, AsyncIterator, Optional
+
+from .inference import InferenceWorker
+from .cache import ResponseCache, normalize_text
+from .providers import get_client, sync_session, provider_setting
+from .metrics import latency
+from .financial_entities import extract_financial_context, context_summary
+from . import rule_responses
 
 # Lazy imports for heavy deps
 _tokenizer = None
@@ -14,18 +27,79 @@ except Exception:
 
 MODEL_ID = os.getenv("GRANITE_MODEL_ID", "ibm-granite/granite-3.1-1b-a400m-instruct")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+# Load and warm up the model when the API starts instead of on the first chat
+MODEL_EAGER_LOAD = os.getenv("MODEL_EAGER_LOAD", "1").lower() not in ("0", "false", "no")
+# CPU inference precision: fp32 (default), bf16, or int8 (dynamic quantization of Linear layers)
+MODEL_PRECISION = os.getenv("MODEL_PRECISION", "fp32").lower()
+
+# After a failed load, wait this long (doubling per failure, capped) before trying again
+MODEL_LOAD_BACKOFF_SECONDS = float(os.getenv("MODEL_LOAD_BACKOFF_SECONDS", "30"))
+MODEL_LOAD_BACKOFF_MAX_SECONDS = float(os.getenv("MODEL_LOAD_BACKOFF_MAX_SECONDS", "900"))
+
+# Chat response cache; CHAT_CACHE_MAX_ENTRIES=0 disables it, CHAT_CACHE_SIMILARITY > 0
+# also serves near-identical questions whose word-overlap cosine reaches the threshold
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "2048"))
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", "21600"))
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0"))
+
+# Hedged chat generation: if Granite has not answered within this budget, race Gemini
+# against it and keep the first acceptable answer (0 disables hedging)
+CHAT_HEDGE_AFTER_MS = float(os.getenv("CHAT_HEDGE_AFTER_MS", "0"))
+
+# Precompute the KV cache of each mode's static preamble and reuse it on every call
+PROMPT_PREFIX_CACHE = os.getenv("PROMPT_PREFIX_CACHE", "1").lower() not in ("0", "false", "no")
+
+# mode -> (prefix text, prefix token ids, past_key_values after the prefix)
+_prefix_cache: Dict[str, Tuple[str, List[int], object]] = {}
+prefix_cache_stats = {"entries": 0, "hits": 0, "misses": 0}
+
+_load_lock = threading.Lock()
+_load_future: Optional[asyncio.Future] = None
+_next_load_attempt = 0.0
+# Set while warm_start runs: a load then only reaches "loaded", and warm_start
+# declares "ready" after warming up, so /api/ready never flaps back to 503
+_warm_start_pending = False
+
+# idle -> loading -> ready (lazy), or idle -> loading -> loaded -> warming -> ready
+# (warm_start); failed / unavailable (no transformers)
+model_status: Dict = {
+    "status": "idle" if _TRANSFORMERS_AVAILABLE else "unavailable",
+    "model_id": MODEL_ID,
+    "error": None,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "failures": 0,
+    "precision": None,
+}
 
 
 def _load_model():
-    global _tokenizer, _model
-    if not _TRANSFORMERS_AVAILABLE or _model is not None:
-        return _TRANSFORMERS_AVAILABLE and _model is not None
+    """Load the tokenizer and model once; concurrent callers block on the same load."""
+    if not _TRANSFORMERS_AVAILABLE:
+        return False
+    if _model is not None:
+        return True
+    with _load_lock:
+        if _model is not None:
+            return True
+        if time.monotonic() < _next_load_attempt:
+            return False
+        return _load_model_locked()
+
+
+def _load_model_locked():
+    global _tokenizer, _model, _next_load_attempt
+    model_status.update(status="loading", error=None)
+    started = time.perf_counter()
     try:
-        _tokenizer = AutoTokenizer.from_pretrained(MODEL_ID, trust_remote_code=True, use_fast=True)
-        if _tokenizer.pad_token is None:
-            _tokenizer.pad_token = _tokenizer.eos_token
-        dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-        _model = AutoModelForCausalLM.from_pretrained(
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_ID, trust_remote_code=True, use_fast=True)
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        # Decoder-only models must be left-padded for batched generation
+        tokenizer.padding_side = "left"
+        precision = "fp16" if torch.cuda.is_available() else MODEL_PRECISION
+        dtype = {"fp16": torch.float16, "bf16": torch.bfloat16}.get(precision, torch.float32)
+        model = AutoModelForCausalLM.from_pretrained(
             MODEL_ID,
             trust_remote_code=True,
             torch_dtype=dtype,
@@ -33,15 +107,67 @@ def _load_model():
             low_cpu_mem_usage=True,
         )
         if not torch.cuda.is_available():
-            _model = _model.to("cpu")
-        _model.eval()
+            model = model.to("cpu")
+        model.eval()
+        if precision == "int8":
+            model = _quantize_dynamic(model)
+        # Publish the model last so lock-free readers never see a half-loaded pair
+        _tokenizer = tokenizer
+        _model = model
+        model_status.update(failures=0, precision=precision, load_seconds=round(time.perf_counter() - started, 2))
+        if PROMPT_PREFIX_CACHE:
+            _prime_prefix_cache()
+        model_status["status"] = "loaded" if _warm_start_pending else "ready"
         return True
-    except Exception:
+    except Exception as e:
+        failures = model_status["failures"] + 1
+        delay = min(MODEL_LOAD_BACKOFF_SECONDS * 2 ** (failures - 1), MODEL_LOAD_BACKOFF_MAX_SECONDS)
+        _next_load_attempt = time.monotonic() + delay
+        print(f"Granite model load failed (attempt {failures}, retrying in {delay:.0f}s): {e}")
+        model_status.update(
+            status="failed",
+            error=str(e),
+            failures=failures,
+            load_seconds=round(time.perf_counter() - started, 2),
+        )
+        return False
+
+
+def unload_model() -> bool:
+    """Drop the loaded model and its prefix cache so the memory can be reclaimed."""
+    global _tokenizer, _model
+    with _load_lock:
+        if _model is None:
+            return False
         _model = None
+        _tokenizer = None
+        _prefix_cache.clear()
+        prefix_cache_stats["entries"] = 0
+        model_status.update(status="idle", precision=None)
+    gc.collect()
+    return True
+
+
+def _quantize_dynamic(model):
+    """Quantize Linear weights to int8; activations are quantized on the fly at inference."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+async def aload_model() -> bool:
+    """Async single-flight wrapper: all awaiting coroutines share one load future."""
+    global _load_future
+    if _model is not None:
+        return True
+    if not _TRANSFORMERS_AVAILABLE:
         return False
+    if _load_future is None or _load_future.done():
+        _load_future = asyncio.get_running_loop().run_in_executor(None, _load_model)
+    # Shield so a cancelled request does not cancel the load other callers wait on
+    return await asyncio.shield(_load_future)
 
 
-def _build_prompt(user_input: str, user_mode: str, scenario_context: str) -> str:
+def _prompt_prefix(user_mode: str) -> str:
+    """Static persona and response-format preamble shared by every prompt of a mode."""
     if user_mode == "student":
         base_prompt = (
             "You are a financial advisor specializing in student financial wellness. "
@@ -65,58 +191,252 @@ def _build_prompt(user_input: str, user_mode: str, scenario_context: str) -> str
             "3. One advanced tip or optimization strategy\n"
         )
 
+    return f"{base_prompt}{response_format}\n"
+
+
+def _build_prompt(user_input: str, user_mode: str, scenario_context: str) -> str:
+    # The per-request parts come last so the preamble's KV cache can be reused
+    prompt = _prompt_prefix(user_mode)
     if scenario_context:
-        base_prompt += scenario_context + "\n\n"
+        prompt += scenario_context + "\n\n"
+    details = context_summary(extract_financial_context(user_input), user_mode)
+    if details:
+        prompt += details + "\n\n"
+
+    return f"{prompt}User Question: {user_input}\nResponse:"
+
+
+def _generation_kwargs(**overrides) -> Dict:
+    kwargs = dict(
+        max_new_tokens=120,
+        temperature=0.5,
+        do_sample=True,
+        top_p=0.9,
+        pad_token_id=_tokenizer.pad_token_id,
+        eos_token_id=_tokenizer.eos_token_id,
+        repetition_penalty=1.15,
+        no_repeat_ngram_size=3,
+        use_cache=True,
+        early_stopping=True,
+    )
+    kwargs.update(overrides)
+    return kwargs
 
-    return f"{base_prompt}User Question: {user_input}\n{response_format}\nResponse:"
 
+def _extract_response(text: str) -> str:
+    return text.split("Response:")[-1].strip() if "Response:" in text else text
 
-def _generate_with_granite(prompt: str) -> str:
+
+def _prompt_token_length(prompt: str) -> int:
+    return min(len(_tokenizer(prompt)["input_ids"]), 450)
+
+
+def _prime_prefix_cache() -> None:
+    """Run the static preambles through the model once and keep their KV caches."""
+    try:
+        from transformers import DynamicCache
+        for mode in ("student", "professional"):
+            prefix = _prompt_prefix(mode)
+            inputs = _tokenizer(prefix, return_tensors="pt")
+            device = next(_model.parameters()).device
+            inputs = {k: v.to(device) for k, v in inputs.items()}
+            with torch.no_grad():
+                out = _model(**inputs, past_key_values=DynamicCache(), use_cache=True)
+            _prefix_cache[mode] = (prefix, inputs["input_ids"][0].tolist(), out.past_key_values)
+        prefix_cache_stats["entries"] = len(_prefix_cache)
+    except Exception as e:
+        print(f"Prompt prefix cache disabled: {e}")
+        _prefix_cache.clear()
+        prefix_cache_stats["entries"] = 0
+
+
+def _encode_prompt(prompt: str) -> Dict:
+    """
+    Tokenize a single prompt. A prompt starting with a cached preamble is encoded
+    as the preamble's ids followed by the separately tokenized rest: tokenized
+    whole, the preamble's trailing "\n\n" splits differently once text follows it,
+    and the ids would no longer start with the cached ones.
+    """
+    for prefix, prefix_ids, _ in _prefix_cache.values():
+        if prompt.startswith(prefix) and len(prompt) > len(prefix):
+            rest = _tokenizer(prompt[len(prefix):], add_special_tokens=False)["input_ids"]
+            input_ids = torch.tensor([(prefix_ids + rest)[:450]])
+            return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+    return _tokenizer(prompt, return_tensors="pt", truncation=True, max_length=450, return_attention_mask=True)
+
+
+def _reusable_prefix(input_ids) -> Optional[object]:
+    """Return a private copy of the cached KV state if input_ids start with a cached preamble."""
+    if not _prefix_cache:
+        return None
+    ids = input_ids.tolist()
+    for _, prefix_ids, past in _prefix_cache.values():
+        if len(ids) > len(prefix_ids) and ids[:len(prefix_ids)] == prefix_ids:
+            prefix_cache_stats["hits"] += 1
+            # generate extends the cache in place, so every call needs its own copy
+            return copy.deepcopy(past)
+    prefix_cache_stats["misses"] += 1
+    return None
+
+
+def _prefix_kwargs(inputs: Dict) -> Dict:
+    # Left padding shifts the preamble in batched inputs, so only single prompts can reuse it
+    if inputs["input_ids"].shape[0] != 1:
+        return {}
+    past = _reusable_prefix(inputs["input_ids"][0])
+    return {"past_key_values": past} if past is not None else {}
+
+
+def _model_generate(inputs: Dict, **kwargs):
+    prefix = _prefix_kwargs(inputs)
+    if prefix:
+        try:
+            return _model.generate(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"], **prefix, **kwargs)
+        except Exception as e:
+            print(f"Prompt prefix cache disabled: {e}")
+            _prefix_cache.clear()
+            prefix_cache_stats["entries"] = 0
+    return _model.generate(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"], **kwargs)
+
+
+def _generate_with_granite_batch(prompts: List[str], **overrides) -> List[str]:
+    """Generate completions for several prompts with one left-padded generate call."""
     import torch  # local import for type
-    inputs = _tokenizer(
-        prompt,
-        return_tensors="pt",
-        truncation=True,
-        max_length=450,
-        padding=True,
-        return_attention_mask=True,
-    )
+    if len(prompts) == 1:
+        inputs = _encode_prompt(prompts[0])
+    else:
+        inputs = _tokenizer(
+            prompts,
+            return_tensors="pt",
+            truncation=True,
+            max_length=450,
+            padding=True,
+            return_attention_mask=True,
+        )
     device = next(_model.parameters()).device
     inputs = {k: v.to(device) for k, v in inputs.items()}
     with torch.no_grad():
-        outputs = _model.generate(
-            input_ids=inputs["input_ids"],
-            attention_mask=inputs["attention_mask"],
-            max_new_tokens=120,
-            temperature=0.5,
-            do_sample=True,
-            top_p=0.9,
-            pad_token_id=_tokenizer.pad_token_id,
-            eos_token_id=_tokenizer.eos_token_id,
-            repetition_penalty=1.15,
-            no_repeat_ngram_size=3,
-            use_cache=True,
-            early_stopping=True,
-        )
-    text = _tokenizer.decode(outputs[0], skip_special_tokens=True)
-    return text.split("Response:")[-1].strip() if "Response:" in text else text
+        outputs = _model_generate(inputs, **_generation_kwargs(**overrides))
+    prompt_len = inputs["input_ids"].shape[1]
+    texts = _tokenizer.batch_decode(outputs[:, prompt_len:], skip_special_tokens=True)
+    return [_extract_response(t.strip()) for t in texts]
+
+
+def _generate_with_granite(prompt: str) -> str:
+    return _generate_with_granite_batch([prompt])[0]
+
+
+def _stream_with_granite(prompt: str, streamer) -> None:
+    """Run generate for one prompt, pushing decoded text into a TextIteratorStreamer."""
+    import torch  # local import for type
+    try:
+        inputs = _encode_prompt(prompt)
+        device = next(_model.parameters()).device
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+        with torch.no_grad():
+            _model_generate(inputs, streamer=streamer, **_generation_kwargs())
+    except Exception:
+        # Unblock the consumer before propagating
+        streamer.end()
+        raise
+
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro"
+
+
+def _gemini_text(payload: Dict) -> str:
+    """
+    Answer text of a generateContent response
+
+    Raises:
+        ValueError: if there is no answer, e.g. a safety-blocked prompt with no
+            candidates; callers treat it like any other Gemini failure
+    """
+    try:
+        text = payload["candidates"][0]["content"]["parts"][0]["text"].strip()
+    except (KeyError, IndexError, TypeError) as e:
+        feedback = payload.get("promptFeedback") if isinstance(payload, dict) else None
+        raise ValueError(f"Gemini returned no answer: {feedback or e!r}") from e
+    if not text:
+        raise ValueError("Gemini returned an empty answer")
+    return text
 
 
 def _generate_with_gemini(prompt: str) -> str:
-    import requests
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GEMINI_API_KEY}"
+    url = f"{GEMINI_URL}:generateContent?key={GEMINI_API_KEY}"
     data = {"contents": [{"parts": [{"text": prompt}]}]}
-    r = requests.post(url, json=data, timeout=30)
+    r = sync_session("gemini").post(url, json=data, timeout=provider_setting("gemini", "timeout_seconds"))
     r.raise_for_status()
-    j = r.json()
-    # Minimal extraction
-    try:
-        return j["candidates"][0]["content"]["parts"][0]["text"].strip()
-    except Exception:
-        return "I'm sorry, I couldn't generate a response right now."
+    return _gemini_text(r.json())
 
 
-def generate_chat_response(req) -> Tuple[str, Dict]:
+async def _agenerate_with_gemini(prompt: str) -> str:
+    url = f"{GEMINI_URL}:generateContent?key={GEMINI_API_KEY}"
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    r = await get_client("gemini").request("POST", url, json=data)
+    return _gemini_text(r.json())
+
+
+async def _astream_with_gemini(prompt: str) -> AsyncIterator[str]:
+    url = f"{GEMINI_URL}:streamGenerateContent?alt=sse&key={GEMINI_API_KEY}"
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+    async with get_client("gemini").stream("POST", url, json=data) as r:
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            try:
+                text = _gemini_text(json.loads(line[len("data:"):]))
+            except Exception:
+                continue
+            if text:
+                yield text
+
+
+async def _aiter_blocking(iterator: Iterator[str]) -> AsyncIterator[str]:
+    """Consume a blocking iterator from the event loop without stalling it."""
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+async def _astream_buffered(chunks: AsyncIterator[str], state: Dict) -> AsyncIterator[Dict]:
+    """
+    Hold back output until it is long enough to count as a real answer, so a
+    provider that produces nothing useful can still fall through to the next one.
+    Sets state["streamed"] as soon as anything has been sent to the client.
+    """
+    buffered = ""
+    async for chunk in chunks:
+        if state.get("streamed"):
+            yield {"token": chunk}
+            continue
+        buffered += chunk
+        if len(buffered.strip()) > 10:
+            state["streamed"] = True
+            yield {"token": buffered.lstrip()}
+
+
+def _generate_after_granite(req, prompt: str, used_fallback: bool) -> Tuple[str, Dict]:
+    # Fallback to Gemini if configured
+    if GEMINI_API_KEY:
+        provider = "gemini"
+        try:
+            response = _generate_with_gemini(prompt)
+            if response and len(response.strip()) > 10:
+                return response, {"provider": provider, "used_fallback": used_fallback}
+        except Exception as e:
+            print(f"Gemini API error: {e}")
+
+    # Enhanced rule-based fallback
+    provider = "rule_based"
+    return _generate_rule_based_response(req.user_input, req.user_mode or "professional"), {"provider": provider, "used_fallback": True}
+
+
+def _generate_chat_response_uncached(req) -> Tuple[str, Dict]:
     prompt = _build_prompt(req.user_input, req.user_mode or "professional", req.scenario_context or "")
 
     used_fallback = False
@@ -133,114 +453,252 @@ def generate_chat_response(req) -> Tuple[str, Dict]:
             print(f"Granite model error: {e}")
             used_fallback = True
 
-    # Fallback to Gemini if configured
+    return _generate_after_granite(req, prompt, used_fallback)
+
+
+# Shared worker that batches concurrent Granite requests into single generate calls
+inference_worker = InferenceWorker(_generate_with_granite_batch, length_fn=_prompt_token_length)
+
+
+async def _timed(name: str, awaitable):
+    """Await and record the latency under name; cancelled calls are not recorded."""
+    started = time.perf_counter()
+    try:
+        result = await awaitable
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        latency.observe(f"{name}_error", time.perf_counter() - started)
+        raise
+    latency.observe(name, time.perf_counter() - started)
+    return result
+
+
+def _acceptable(response: str) -> bool:
+    return bool(response) and len(response.strip()) > 10
+
+
+hedge_stats = {"hedged": 0, "wins": {"granite": 0, "gemini": 0}}
+
+
+async def _agenerate_hedged(prompt: str) -> Tuple[Optional[Tuple[str, Dict]], bool, bool]:
+    """
+    Start Granite; once CHAT_HEDGE_AFTER_MS passes without an answer, also start
+    Gemini. The first acceptable answer wins and the other request is cancelled.
+    Returns (result or None, whether Gemini was tried, whether Granite failed).
+    """
+    granite = asyncio.ensure_future(_timed("granite", inference_worker.submit(prompt)))
+    providers = {granite: "granite"}
+    pending = {granite}
+    used_fallback = False
+    try:
+        done, _ = await asyncio.wait(pending, timeout=CHAT_HEDGE_AFTER_MS / 1000.0)
+        if not done:
+            hedge_stats["hedged"] += 1
+            gemini = asyncio.ensure_future(_timed("gemini", _agenerate_with_gemini(prompt)))
+            providers[gemini] = "gemini"
+            pending.add(gemini)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                provider = providers[task]
+                try:
+                    response = task.result()
+                except Exception as e:
+                    print(f"{provider.capitalize()} error: {e}")
+                    used_fallback = used_fallback or provider == "granite"
+                    continue
+                if _acceptable(response):
+                    if len(providers) > 1:
+                        hedge_stats["wins"][provider] += 1
+                    meta = {"provider": provider, "used_fallback": used_fallback, "hedged": len(providers) > 1}
+                    return (response, meta), len(providers) > 1, used_fallback
+    finally:
+        for task in pending:
+            task.cancel()
+    return None, len(providers) > 1, used_fallback
+
+
+def _rule_based_result(req) -> Tuple[str, Dict]:
+    return _generate_rule_based_response(req.user_input, req.user_mode or "professional"), {"provider": "rule_based", "used_fallback": True}
+
+
+async def _agenerate_after_granite(req, prompt: str, used_fallback: bool) -> Tuple[str, Dict]:
     if GEMINI_API_KEY:
-        provider = "gemini"
         try:
-            response = _generate_with_gemini(prompt)
-            if response and len(response.strip()) > 10:
-                return response, {"provider": provider, "used_fallback": used_fallback}
+            response = await _timed("gemini", _agenerate_with_gemini(prompt))
+            if _acceptable(response):
+                return response, {"provider": "gemini", "used_fallback": used_fallback}
         except Exception as e:
             print(f"Gemini API error: {e}")
 
-    # Enhanced rule-based fallback
-    provider = "rule_based"
-    return _generate_rule_based_response(req.user_input, req.user_mode or "professional"), {"provider": provider, "used_fallback": True}
+    return _rule_based_result(req)
 
 
-def _generate_rule_based_response(user_input: str, user_mode: str) -> str:
-    """Generate rule-based responses for common financial questions"""
-    user_input_lower = user_input.lower()
+async def _agenerate_chat_response_uncached(req) -> Tuple[str, Dict]:
+    prompt = _build_prompt(req.user_input, req.user_mode or "professional", req.scenario_context or "")
 
-    # Budget-related responses
-    if any(word in user_input_lower for word in ["budget", "budgeting", "spending", "expenses"]):
-        if user_mode == "student":
-            return """🎓 **Student Budgeting Guide**
+    used_fallback = False
+    if await aload_model():
+        if CHAT_HEDGE_AFTER_MS > 0 and GEMINI_API_KEY:
+            result, gemini_tried, used_fallback = await _agenerate_hedged(prompt)
+            if result is not None:
+                return result
+            if gemini_tried:
+                return _rule_based_result(req)
+        else:
+            try:
+                response = await _timed("granite", inference_worker.submit(prompt))
+                if _acceptable(response):
+                    return response, {"provider": "granite", "used_fallback": used_fallback}
+            except Exception as e:
+                print(f"Granite model error: {e}")
+                used_fallback = True
 
-1. **Track Your Income & Expenses**: Use apps like Mint or YNAB to monitor where your money goes
-2. **Follow the 50/30/20 Rule**: 50% needs, 30% wants, 20% savings
-3. **Student-Specific Tips**:
-   • Cook meals instead of eating out
-   • Buy used textbooks or rent them
-   • Take advantage of student discounts
+    return await _agenerate_after_granite(req, prompt, used_fallback)
 
-💡 **Pro Tip**: Start with a simple spreadsheet to track expenses for one month."""
-        else:
-            return """💼 **Professional Budgeting Strategy**
-
-1. **Zero-Based Budgeting**: Assign every dollar a purpose before the month begins
-2. **Automate Your Finances**: Set up automatic transfers to savings and investments
-3. **Advanced Strategies**:
-   • Use multiple savings accounts for different goals
-   • Review and adjust quarterly
-   • Consider tax-advantaged accounts
-
-📊 **Recommendation**: Aim to save 20-25% of gross income for optimal financial health."""
-
-    # Investment-related responses
-    elif any(word in user_input_lower for word in ["invest", "investment", "stocks", "portfolio"]):
-        if user_mode == "student":
-            return """🎓 **Student Investment Basics**
-
-1. **Start Small**: Begin with $25-50/month in a low-cost index fund
-2. **Use Student-Friendly Platforms**: Consider Acorns, Stash, or Robinhood
-3. **Focus on Learning**:
-   • Read "The Bogleheads' Guide to Investing"
-   • Understand compound interest
-   • Learn about diversification
-
-⚠️ **Important**: Only invest money you won't need for 5+ years."""
+
+async def _astream_chat_response_uncached(req) -> AsyncIterator[Dict]:
+    """Granite streams through a TextIteratorStreamer, Gemini through its SSE API."""
+    prompt = _build_prompt(req.user_input, req.user_mode or "professional", req.scenario_context or "")
+
+    used_fallback = False
+    if await aload_model():
+        from transformers import TextIteratorStreamer
+        streamer = TextIteratorStreamer(_tokenizer, skip_prompt=True, skip_special_tokens=True)
+        generation = inference_worker.execute(_stream_with_granite, prompt, streamer)
+        state: Dict = {}
+        try:
+            async for event in _astream_buffered(_aiter_blocking(iter(streamer)), state):
+                yield event
+            await generation
+        except Exception as e:
+            print(f"Granite model error: {e}")
+            used_fallback = True
+        if state.get("streamed"):
+            # A stream that failed partway is still delivered, but marked truncated
+            yield {"done": True, "provider": "granite", "used_fallback": used_fallback, "truncated": used_fallback}
+            return
+
+    if GEMINI_API_KEY:
+        state = {}
+        truncated = False
+        try:
+            async for event in _astream_buffered(_astream_with_gemini(prompt), state):
+                yield event
+        except Exception as e:
+            print(f"Gemini API error: {e}")
+            truncated = True
+        if state.get("streamed"):
+            yield {"done": True, "provider": "gemini", "used_fallback": used_fallback, "truncated": truncated}
+            return
+
+    yield {"token": _generate_rule_based_response(req.user_input, req.user_mode or "professional")}
+    yield {"done": True, "provider": "rule_based", "used_fallback": True}
+
+
+chat_cache = ResponseCache(
+    max_entries=CHAT_CACHE_MAX_ENTRIES,
+    ttl_seconds=CHAT_CACHE_TTL_SECONDS,
+    similarity_threshold=CHAT_CACHE_SIMILARITY,
+)
+
+
+def _cache_bucket(req) -> Tuple[str, str]:
+    return (req.user_mode or "professional", normalize_text(req.scenario_context or ""))
+
+
+def _cache_lookup(req) -> Optional[Tuple[str, Dict]]:
+    if CHAT_CACHE_MAX_ENTRIES <= 0 or getattr(req, "bypass_cache", False):
+        return None
+    hit = chat_cache.get(req.user_input, _cache_bucket(req))
+    if hit is None:
+        return None
+    text, meta = hit
+    return text, {**meta, "cached": True}
+
+
+def _cache_store(req, text: str, meta: Dict) -> None:
+    # Rule-based answers are cheaper to recompute than to cache, and would
+    # otherwise keep being served after the model comes back
+    if CHAT_CACHE_MAX_ENTRIES <= 0 or meta.get("provider") == "rule_based":
+        return
+    chat_cache.set(req.user_input, (text, meta), _cache_bucket(req))
+
+
+def generate_chat_response(req) -> Tuple[str, Dict]:
+    hit = _cache_lookup(req)
+    if hit is not None:
+        return hit
+    text, meta = _generate_chat_response_uncached(req)
+    _cache_store(req, text, meta)
+    return text, meta
+
+
+async def agenerate_chat_response(req) -> Tuple[str, Dict]:
+    """Async variant of generate_chat_response that routes Granite through the batching worker."""
+    hit = _cache_lookup(req)
+    if hit is not None:
+        return hit
+    text, meta = await _agenerate_chat_response_uncached(req)
+    _cache_store(req, text, meta)
+    return text, meta
+
+
+async def astream_chat_response(req) -> AsyncIterator[Dict]:
+    """
+    Stream a chat answer as {"token": str} events followed by one final
+    {"done": True, "provider": str, "used_fallback": bool, "cached": bool} event.
+    """
+    hit = _cache_lookup(req)
+    if hit is not None:
+        text, meta = hit
+        yield {"token": text}
+        yield {"done": True, **meta}
+        return
+    parts: List[str] = []
+    async for event in _astream_chat_response_uncached(req):
+        if event.get("done"):
+            meta = {"provider": event["provider"], "used_fallback": event["used_fallback"]}
+            # Only an answer that streamed to the end is worth serving again
+            if not event.get("truncated"):
+                _cache_store(req, "".join(parts), meta)
+            yield {**event, "cached": False}
         else:
-            return """💼 **Professional Investment Strategy**
-
-1. **Asset Allocation**: Diversify across stocks, bonds, and real estate
-2. **Tax-Advantaged Accounts**: Max out 401(k) match, then Roth IRA
-3. **Advanced Strategies**:
-   • Dollar-cost averaging into index funds
-   • Consider target-date funds for simplicity
-   • Rebalance annually
-
-📈 **Target**: Aim for 10-15% total savings rate including employer match."""
-
-    # Emergency fund responses
-    elif any(word in user_input_lower for word in ["emergency", "fund", "savings"]):
-        return """🚨 **Emergency Fund Essentials**
-
-1. **Target Amount**: 3-6 months of essential expenses
-2. **Where to Keep It**: High-yield savings account (2-5% APY)
-3. **Building Strategy**:
-   • Start with $500-1000 mini emergency fund
-   • Save $25-100 per week consistently
-   • Use windfalls (tax refunds, bonuses)
-
-💰 **Quick Start**: Set up automatic transfer of $50/week to savings."""
-
-    # Debt-related responses
-    elif any(word in user_input_lower for word in ["debt", "credit card", "loan", "pay off"]):
-        return """💳 **Debt Elimination Strategy**
-
-1. **List All Debts**: Amount, minimum payment, interest rate
-2. **Choose Your Method**:
-   • **Debt Avalanche**: Pay minimums, extra to highest interest rate
-   • **Debt Snowball**: Pay minimums, extra to smallest balance
-3. **Accelerate Payoff**:
-   • Use windfalls for extra payments
-   • Consider balance transfers for high-interest debt
-   • Avoid taking on new debt
-
-🎯 **Priority**: Pay off credit cards first (typically 18-25% interest)."""
-
-    # Default response
-    else:
-        return """💰 **Personal Finance Fundamentals**
+            parts.append(event["token"])
+            yield event
 
-1. **Emergency Fund**: Save 3-6 months of expenses
-2. **Debt Management**: Pay off high-interest debt first
-3. **Budgeting**: Track income and expenses monthly
-4. **Investing**: Start with low-cost index funds
-5. **Insurance**: Protect against major financial risks
 
-📚 **Recommended Reading**: "The Total Money Makeover" by Dave Ramsey
+def _warm_up() -> None:
+    """Run a short batched generate so the first real request skips one-time initialization."""
+    prompts = [
+        _build_prompt("How do I start budgeting?", "student", ""),
+        _build_prompt("How should I invest my bonus?", "professional", ""),
+    ]
+    _generate_with_granite_batch(prompts, max_new_tokens=8)
 
-💡 **Next Step**: Choose one area to focus on this month and take action!"""
+
+async def warm_start() -> None:
+    """Load the model in the background and warm it up; progress is tracked in model_status."""
+    global _warm_start_pending
+    _warm_start_pending = True
+    try:
+        if not await aload_model():
+            return
+        model_status["status"] = "warming"
+        started = time.perf_counter()
+        try:
+            await inference_worker.execute(_warm_up)
+        except Exception as e:
+            print(f"Granite warm-up error: {e}")
+        model_status.update(status="ready", warmup_seconds=round(time.perf_counter() - started, 2))
+    finally:
+        # Later (lazy) loads, e.g. retries after a failed load, go straight to "ready"
+        _warm_start_pending = False
+
+
+def _generate_rule_based_response(user_input: str, user_mode: str) -> str:
+    """Generate rule-based responses for common financial questions"""
+    amounts = extract_financial_context(user_input).get("amounts", [])
+    return rule_responses.answer(user_input, user_mode, amounts[0] if len(amounts) == 1 else None)
 
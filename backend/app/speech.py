@@ -1,6 +1,7 @@
 import os
 from pydantic import BaseModel
-import requests
+
+from .providers import get_client, sync_session, provider_setting
 
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY", "")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY", "")
@@ -20,28 +21,56 @@ class TTSResponse(BaseModel):
     audio_base64: str  # mp3 base64
 
 
-def call_deepgram(audio_bytes: bytes, content_type: str | None) -> str:
-    if not DEEPGRAM_API_KEY:
-        return ""
-    url = "https://api.deepgram.com/v1/listen?punctuate=true"
+DEEPGRAM_URL = "https://api.deepgram.com/v1/listen?punctuate=true"
+
+
+def _elevenlabs_request(text: str):
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
+    payload = {"text": text, "model_id": "eleven_multilingual_v2"}
+    return url, payload
+
+
+def _deepgram_headers(content_type: str | None) -> dict:
     headers = dict(audio_auth_header)
     if content_type:
         headers["Content-Type"] = content_type
-    r = requests.post(url, headers=headers, data=audio_bytes, timeout=60)
-    r.raise_for_status()
-    j = r.json()
+    return headers
+
+
+def _deepgram_transcript(j: dict) -> str:
     try:
         return j["results"]["channels"][0]["alternatives"][0]["transcript"]
     except Exception:
         return ""
 
 
+def call_deepgram(audio_bytes: bytes, content_type: str | None) -> str:
+    if not DEEPGRAM_API_KEY:
+        return ""
+    r = sync_session("deepgram").post(DEEPGRAM_URL, headers=_deepgram_headers(content_type), data=audio_bytes, timeout=provider_setting("deepgram", "timeout_seconds"))
+    r.raise_for_status()
+    return _deepgram_transcript(r.json())
+
+
+async def acall_deepgram(audio_bytes: bytes, content_type: str | None) -> str:
+    if not DEEPGRAM_API_KEY:
+        return ""
+    r = await get_client("deepgram").request("POST", DEEPGRAM_URL, headers=_deepgram_headers(content_type), content=audio_bytes)
+    return _deepgram_transcript(r.json())
+
+
 def call_elevenlabs(text: str) -> bytes:
     if not ELEVENLABS_API_KEY:
         return b""
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}"
-    payload = {"text": text, "model_id": "eleven_multilingual_v2"}
-    r = requests.post(url, headers=tt_headers, json=payload, timeout=60)
+    url, payload = _elevenlabs_request(text)
+    r = sync_session("elevenlabs").post(url, headers=tt_headers, json=payload, timeout=provider_setting("elevenlabs", "timeout_seconds"))
     r.raise_for_status()
     return r.content
 
+
+async def acall_elevenlabs(text: str) -> bytes:
+    if not ELEVENLABS_API_KEY:
+        return b""
+    url, payload = _elevenlabs_request(text)
+    r = await get_client("elevenlabs").request("POST", url, headers=tt_headers, json=payload)
+    return r.content
@@ -1,53 +1,632 @@
+import argparse
+import atexit
 import json
 import os
+import sqlite3
+import threading
+import time
 import uuid
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 SESSIONS_PATH = os.getenv("SESSIONS_PATH", os.path.join(os.path.dirname(__file__), "sessions.json"))
+SESSIONS_DB_PATH = os.getenv("SESSIONS_DB_PATH", os.path.join(os.path.dirname(__file__), "sessions.db"))
+# "sqlite" (default) or "json" for the single-file store with write-behind caching
+SESSIONS_BACKEND = os.getenv("SESSIONS_BACKEND", "sqlite").lower()
+# JSON store: seconds to coalesce writes before rewriting the snapshot, the number of
+# pending operations that forces an early flush, and whether to fsync every journal entry
+SESSIONS_FLUSH_DELAY = float(os.getenv("SESSIONS_FLUSH_DELAY", "1.0"))
+SESSIONS_FLUSH_MAX_PENDING = int(os.getenv("SESSIONS_FLUSH_MAX_PENDING", "1000"))
+SESSIONS_JOURNAL_FSYNC = os.getenv("SESSIONS_JOURNAL_FSYNC", "0").lower() in ("1", "true", "yes")
 
-def _load() -> Dict:
-    if not os.path.exists(SESSIONS_PATH):
-        return {"sessions": []}
-    try:
-        with open(SESSIONS_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {"sessions": []}
-
-def _save(data: Dict):
-    os.makedirs(os.path.dirname(SESSIONS_PATH), exist_ok=True)
-    with open(SESSIONS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
 
-def create_session(title: str | None = None) -> Dict:
-    data = _load()
-    sid = str(uuid.uuid4())[:8]
-    session = {
+def _new_session(sid: str, title: str) -> Dict:
+    return {
         "id": sid,
-        "title": title or f"Session {len(data['sessions'])+1}",
+        "title": title,
         "created_at": datetime.utcnow().isoformat() + "Z",
         "messages": [],
     }
-    data["sessions"].append(session)
-    _save(data)
-    return session
 
-def list_sessions() -> List[Dict]:
-    return _load().get("sessions", [])
+
+class SessionStore:
+    """Interface implemented by the session storage backends."""
+
+    def create_session(self, title: str | None = None) -> Dict:
+        raise NotImplementedError
+
+    def list_sessions(self, limit: int | None = None, after: str | None = None) -> List[Dict]:
+        """Sessions in creation order, starting after the session id `after`."""
+        raise NotImplementedError
+
+    def get_session(self, sid: str) -> Dict | None:
+        raise NotImplementedError
+
+    def update_session_messages(self, sid: str, messages: List[Dict]) -> Dict | None:
+        raise NotImplementedError
+
+    def append_messages(self, sid: str, messages: List[Dict]) -> int | None:
+        """Append messages; returns the new message count, or None if the session is unknown."""
+        raise NotImplementedError
+
+    def get_messages(self, sid: str, limit: int, after: int | None = None, before: int | None = None) -> List[Dict] | None:
+        """
+        Up to `limit` messages with their `position`, oldest first: those after
+        position `after`, or the ones just before position `before`, or the
+        first page. Returns None if the session is unknown.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Persist any buffered writes."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JSONSessionStore(SessionStore):
+    """Original store: every operation loads and rewrites one JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.path):
+            return {"sessions": []}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {"sessions": []}
+
+    def _save(self, data: Dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def create_session(self, title: str | None = None) -> Dict:
+        with self._lock:
+            data = self._load()
+            session = _new_session(str(uuid.uuid4())[:8], title or f"Session {len(data['sessions'])+1}")
+            data["sessions"].append(session)
+            self._save(data)
+            return session
+
+    def list_sessions(self, limit: int | None = None, after: str | None = None) -> List[Dict]:
+        sessions = self._load().get("sessions", [])
+        if after is not None:
+            ids = [s.get("id") for s in sessions]
+            sessions = sessions[ids.index(after) + 1:] if after in ids else []
+        return sessions[:limit] if limit is not None else sessions
+
+    def get_session(self, sid: str) -> Dict | None:
+        for s in self._load().get("sessions", []):
+            if s.get("id") == sid:
+                return s
+        return None
+
+    def update_session_messages(self, sid: str, messages: List[Dict]) -> Dict | None:
+        with self._lock:
+            data = self._load()
+            for s in data.get("sessions", []):
+                if s.get("id") == sid:
+                    s["messages"] = messages
+                    self._save(data)
+                    return s
+        return None
+
+    def append_messages(self, sid: str, messages: List[Dict]) -> int | None:
+        with self._lock:
+            data = self._load()
+            for s in data.get("sessions", []):
+                if s.get("id") == sid:
+                    s["messages"].extend(messages)
+                    self._save(data)
+                    return len(s["messages"])
+        return None
+
+    def get_messages(self, sid: str, limit: int, after: int | None = None, before: int | None = None) -> List[Dict] | None:
+        session = self.get_session(sid)
+        if session is None:
+            return None
+        indexed = [{"position": i, **m} for i, m in enumerate(session.get("messages", []))]
+        if after is not None:
+            return indexed[after + 1:after + 1 + limit]
+        if before is not None:
+            end = max(0, min(before, len(indexed)))
+            return indexed[max(0, end - limit):end]
+        return indexed[:limit]
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # directories cannot be opened on Windows
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _apply_entry(sessions: Dict[str, Dict], entry: Dict) -> None:
+    op = entry["op"]
+    if op == "create":
+        sessions.setdefault(entry["session"]["id"], entry["session"])
+        return
+    session = sessions.get(entry["id"])
+    if session is None:
+        return
+    if op == "set_messages":
+        session["messages"] = entry["messages"]
+    elif op == "append":
+        session["messages"] = session["messages"][:entry["start"]] + entry["messages"]
+
+
+def _replay_journal(sessions: Dict[str, Dict], journal_path: str) -> int:
+    if not os.path.exists(journal_path):
+        return 0
+    count = 0
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn line from a crash mid-write
+            _apply_entry(sessions, entry)
+            count += 1
+    return count
+
+
+def load_json_sessions(path: str = SESSIONS_PATH) -> List[Dict]:
+    """
+    Sessions of a WriteBehindJSONSessionStore file, including journal entries
+    not yet flushed into the snapshot. Read-only: no files are created or changed.
+    """
+    sessions = {session["id"]: session for session in JSONSessionStore(path).list_sessions()}
+    for journal_path in (path + ".journal.flushing", path + ".journal"):
+        _replay_journal(sessions, journal_path)
+    return list(sessions.values())
+
+
+class WriteBehindJSONSessionStore(SessionStore):
+    """
+    JSON store that serves reads from memory and coalesces writes.
+
+    Every mutation is applied in memory and appended to `<path>.journal` as one
+    JSON line; a background thread rewrites the snapshot at most once per
+    flush_delay (atomic rename after fsync) and then drops the journal entries it
+    covers. On start-up the snapshot is loaded and the journals are replayed, so
+    a crash loses at most what the OS had not yet written out (nothing, with
+    SESSIONS_JOURNAL_FSYNC=1). Journal entries are idempotent to make replaying
+    entries already contained in the snapshot harmless.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_delay: float = SESSIONS_FLUSH_DELAY,
+        max_pending: int = SESSIONS_FLUSH_MAX_PENDING,
+        journal_fsync: bool = SESSIONS_JOURNAL_FSYNC,
+    ):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.flushing_path = path + ".journal.flushing"
+        self.flush_delay = flush_delay
+        self.max_pending = max_pending
+        self.journal_fsync = journal_fsync
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._pending = 0
+        self._sessions: Dict[str, Dict] = {}
+        self.stats = {"flushes": 0, "journal_entries": 0, "last_flush_seconds": 0.0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        for session in JSONSessionStore(path).list_sessions():
+            self._sessions[session["id"]] = session
+        recovered = self._replay(self.flushing_path) + self._replay(self.journal_path)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        if recovered:
+            self._pending = recovered
+            self.flush()
+
+        self._thread = threading.Thread(target=self._run, name="sessions-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Journal -------------------------------------------------------------
+
+    def _apply(self, entry: Dict) -> None:
+        _apply_entry(self._sessions, entry)
+
+    def _replay(self, journal_path: str) -> int:
+        return _replay_journal(self._sessions, journal_path)
+
+    def _record(self, entry: Dict) -> None:
+        """Apply and journal one mutation; caller holds self._lock."""
+        self._apply(entry)
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        if self.journal_fsync:
+            os.fsync(self._journal.fileno())
+        self.stats["journal_entries"] += 1
+        self._pending += 1
+        self._wake.set()
+
+    # Flushing ------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait()
+            if self._closed:
+                return
+            # Debounce: let more writes accumulate unless the backlog is large
+            deadline = time.monotonic() + self.flush_delay
+            while self._pending < self.max_pending and time.monotonic() < deadline and not self._closed:
+                time.sleep(min(0.05, self.flush_delay))
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Session snapshot flush failed: {e}")
+                time.sleep(self.flush_delay)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                self._wake.clear()
+                if not self._pending:
+                    return
+                started = time.perf_counter()
+                snapshot = {"sessions": [{**s, "messages": list(s["messages"])} for s in self._sessions.values()]}
+                # Entries written from now on go to a fresh journal
+                self._journal.close()
+                self._rotate_journal()
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+                flushed, self._pending = self._pending, 0
+
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                _fsync_dir(self.path)
+            except Exception:
+                # The entries stay in the flushing journal; retry on the next flush
+                with self._lock:
+                    self._pending += flushed
+                    self._wake.set()
+                raise
+            os.remove(self.flushing_path)
+            self.stats["flushes"] += 1
+            self.stats["last_flush_seconds"] = round(time.perf_counter() - started, 4)
+
+    def _rotate_journal(self) -> None:
+        """
+        Move the journal's entries to the flushing journal. A flushing journal
+        left by a failed flush still holds entries missing from the snapshot,
+        so the journal is appended to it instead of replacing it.
+        """
+        if not os.path.exists(self.flushing_path):
+            os.replace(self.journal_path, self.flushing_path)
+            return
+        with open(self.flushing_path, "a+b") as dst, open(self.journal_path, "rb") as src:
+            dst.seek(0, os.SEEK_END)
+            if dst.tell():
+                dst.seek(-1, os.SEEK_END)
+                if dst.read(1) != b"\n":
+                    dst.write(b"\n")  # keep a torn last entry from swallowing the next one
+            dst.write(src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_path)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._wake.set()
+        with self._lock:
+            self._journal.close()
+
+    # SessionStore --------------------------------------------------------
+
+    @staticmethod
+    def _copy(session: Dict) -> Dict:
+        return {**session, "messages": list(session["messages"])}
+
+    def create_session(self, title: str | None = None) -> Dict:
+        with self._lock:
+            sid = str(uuid.uuid4())[:8]
+            while sid in self._sessions:
+                sid = str(uuid.uuid4())[:8]
+            session = _new_session(sid, title or f"Session {len(self._sessions)+1}")
+            self._record({"op": "create", "session": session})
+            return self._copy(session)
+
+    def list_sessions(self, limit: int | None = None, after: str | None = None) -> List[Dict]:
+        with self._lock:
+            ids = list(self._sessions)
+            start = 0
+            if after is not None:
+                start = ids.index(after) + 1 if after in self._sessions else len(ids)
+            end = len(ids) if limit is None else start + limit
+            return [self._copy(self._sessions[sid]) for sid in ids[start:end]]
+
+    def get_session(self, sid: str) -> Dict | None:
+        with self._lock:
+            session = self._sessions.get(sid)
+            return self._copy(session) if session is not None else None
+
+    def update_session_messages(self, sid: str, messages: List[Dict]) -> Dict | None:
+        with self._lock:
+            if sid not in self._sessions:
+                return None
+            self._record({"op": "set_messages", "id": sid, "messages": list(messages)})
+            return self._copy(self._sessions[sid])
+
+    def append_messages(self, sid: str, messages: List[Dict]) -> int | None:
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None
+            self._record({"op": "append", "id": sid, "start": len(session["messages"]), "messages": list(messages)})
+            return len(session["messages"])
+
+    def get_messages(self, sid: str, limit: int, after: int | None = None, before: int | None = None) -> List[Dict] | None:
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None
+            messages = session["messages"]
+            if after is not None:
+                start = after + 1
+            elif before is not None:
+                start = max(0, min(before, len(messages)) - limit)
+                limit = min(limit, max(0, before))
+            else:
+                start = 0
+            return [{"position": i, **m} for i, m in enumerate(messages[start:start + limit], start)]
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite store in WAL mode: sessions are looked up by primary key and each
+    message is its own row keyed by (session_id, position), so appends insert
+    rows instead of rewriting the conversation.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        session_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        PRIMARY KEY (session_id, position)
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; keep one per worker thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _messages_for(self, conn: sqlite3.Connection, sids: List[str]) -> Dict[str, List[Dict]]:
+        by_session: Dict[str, List[Dict]] = {sid: [] for sid in sids}
+        if not sids:
+            return by_session
+        placeholders = ",".join("?" * len(sids))
+        rows = conn.execute(
+            f"SELECT session_id, role, content FROM messages WHERE session_id IN ({placeholders}) "
+            "ORDER BY session_id, position",
+            sids,
+        )
+        for row in rows:
+            by_session[row["session_id"]].append({"role": row["role"], "content": row["content"]})
+        return by_session
+
+    def _insert_messages(self, conn: sqlite3.Connection, sid: str, start: int, messages: List[Dict]) -> None:
+        conn.executemany(
+            "INSERT INTO messages (session_id, position, role, content) VALUES (?, ?, ?, ?)",
+            [(sid, start + i, m["role"], m["content"]) for i, m in enumerate(messages)],
+        )
+
+    def create_session(self, title: str | None = None) -> Dict:
+        conn = self._conn()
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                count = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM sessions").fetchone()[0]
+                session = _new_session(str(uuid.uuid4())[:8], title or f"Session {count+1}")
+                conn.execute(
+                    "INSERT INTO sessions (id, title, created_at) VALUES (?, ?, ?)",
+                    (session["id"], session["title"], session["created_at"]),
+                )
+                conn.execute("COMMIT")
+                return session
+            except sqlite3.IntegrityError:
+                # Short ids can collide in large stores; draw another one
+                conn.execute("ROLLBACK")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def list_sessions(self, limit: int | None = None, after: str | None = None) -> List[Dict]:
+        conn = self._conn()
+        query = "SELECT id, title, created_at FROM sessions"
+        params: list = []
+        if after is not None:
+            query += " WHERE seq > COALESCE((SELECT seq FROM sessions WHERE id = ?), (SELECT MAX(seq) FROM sessions))"
+            params.append(after)
+        query += " ORDER BY seq"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        sessions = [dict(row) for row in conn.execute(query, params)]
+        messages = self._messages_for(conn, [s["id"] for s in sessions])
+        for s in sessions:
+            s["messages"] = messages[s["id"]]
+        return sessions
+
+    def get_session(self, sid: str) -> Dict | None:
+        conn = self._conn()
+        row = conn.execute("SELECT id, title, created_at FROM sessions WHERE id = ?", (sid,)).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        session["messages"] = self._messages_for(conn, [sid])[sid]
+        return session
+
+    def update_session_messages(self, sid: str, messages: List[Dict]) -> Dict | None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT id, title, created_at FROM sessions WHERE id = ?", (sid,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (sid,))
+            self._insert_messages(conn, sid, 0, messages)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        session = dict(row)
+        session["messages"] = list(messages)
+        return session
+
+    def append_messages(self, sid: str, messages: List[Dict]) -> int | None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM sessions WHERE id = ?", (sid,)).fetchone() is None:
+                conn.execute("ROLLBACK")
+                return None
+            start = conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM messages WHERE session_id = ?", (sid,)
+            ).fetchone()[0]
+            self._insert_messages(conn, sid, start, messages)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return start + len(messages)
+
+    def get_messages(self, sid: str, limit: int, after: int | None = None, before: int | None = None) -> List[Dict] | None:
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM sessions WHERE id = ?", (sid,)).fetchone() is None:
+            return None
+        columns = "SELECT position, role, content FROM messages WHERE session_id = ?"
+        if after is not None:
+            rows = conn.execute(f"{columns} AND position > ? ORDER BY position LIMIT ?", (sid, after, limit))
+        elif before is not None:
+            rows = conn.execute(f"{columns} AND position < ? ORDER BY position DESC LIMIT ?", (sid, before, limit))
+            rows = reversed(rows.fetchall())
+        else:
+            rows = conn.execute(f"{columns} ORDER BY position LIMIT ?", (sid, limit))
+        return [dict(row) for row in rows]
+
+    def import_sessions(self, sessions: List[Dict]) -> int:
+        """Bulk-load sessions (e.g. from the JSON store); existing ids are skipped."""
+        conn = self._conn()
+        imported = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for s in sessions:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, title, created_at) VALUES (?, ?, ?)",
+                    (s["id"], s.get("title") or "Untitled", s.get("created_at") or ""),
+                )
+                if cur.rowcount:
+                    self._insert_messages(conn, s["id"], 0, s.get("messages", []))
+                    imported += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return imported
+
+
+def migrate_json_to_sqlite(json_path: str = SESSIONS_PATH, db_path: str = SESSIONS_DB_PATH) -> int:
+    """Copy every session from the JSON file into the SQLite database; returns how many were added."""
+    return SQLiteSessionStore(db_path).import_sessions(load_json_sessions(json_path))
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSIONS_BACKEND == "json":
+                    _store = WriteBehindJSONSessionStore(SESSIONS_PATH)
+                else:
+                    fresh = not os.path.exists(SESSIONS_DB_PATH)
+                    _store = SQLiteSessionStore(SESSIONS_DB_PATH)
+                    if fresh and os.path.exists(SESSIONS_PATH):
+                        # First start on SQLite: carry over the existing JSON sessions
+                        migrate_json_to_sqlite(SESSIONS_PATH, SESSIONS_DB_PATH)
+    return _store
+
+
+def create_session(title: str | None = None) -> Dict:
+    return get_store().create_session(title)
+
+def list_sessions(limit: int | None = None, after: str | None = None) -> List[Dict]:
+    return get_store().list_sessions(limit, after)
 
 def get_session(sid: str) -> Dict | None:
-    for s in _load().get("sessions", []):
-        if s.get("id") == sid:
-            return s
-    return None
+    return get_store().get_session(sid)
 
 def update_session_messages(sid: str, messages: List[Dict]) -> Dict | None:
-    data = _load()
-    for s in data.get("sessions", []):
-        if s.get("id") == sid:
-            s["messages"] = messages
-            _save(data)
-            return s
-    return None
+    return get_store().update_session_messages(sid, messages)
+
+def append_messages(sid: str, messages: List[Dict]) -> int | None:
+    return get_store().append_messages(sid, messages)
+
+def get_messages(sid: str, limit: int, after: int | None = None, before: int | None = None) -> List[Dict] | None:
+    return get_store().get_messages(sid, limit, after, before)
+
+def flush() -> None:
+    """Persist buffered session writes (called on shutdown)."""
+    if _store is not None:
+        _store.flush()
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Copy sessions from the JSON file into SQLite")
+    migrate.add_argument("--json", default=SESSIONS_PATH, help="source sessions.json")
+    migrate.add_argument("--db", default=SESSIONS_DB_PATH, help="target SQLite database")
+    args = parser.parse_args()
+    if args.command == "migrate":
+        count = migrate_json_to_sqlite(args.json, args.db)
+        print(f"Migrated {count} sessions from {args.json} to {args.db}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark financial entity extraction
+
+Compares the precompiled extractor in backend/app/financial_entities.py with
+the previous implementation (one lowercase + findall per pattern and one
+substring scan per keyword) on a mix of short and long chat messages.
+
+Usage:
+    python benchmark_entities.py
+    python benchmark_entities.py --iterations 20000
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add backend to path, ahead of the Streamlit app.py that would shadow the app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from app.financial_entities import extract_financial_context
+
+MESSAGES = [
+    "How do I start budgeting?",
+    "I have $5,000 in credit card debt and two student loans. Can I pay them off in 18 months?",
+    "Should I put $6,500 in my Roth IRA or max out my 401k first? I'm 29 years old and married.",
+    "We are saving for a house and a wedding, about $40,000 over 3 years, using a high-yield savings account. "
+    "My partner is a graduate student with a car loan, and we also hold some stocks, bonds and an ETF. " * 4,
+]
+
+
+def legacy_extract_financial_context(user_input):
+    """The extractor as it was in app.py before the single-pass version"""
+    context = {}
+    amounts = re.findall(r'\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)', user_input.lower())
+    if amounts:
+        context['amounts'] = [float(amt.replace(',', '')) for amt in amounts]
+    time_patterns = {'months': r'(\d+)\s*months?', 'years': r'(\d+)\s*years?', 'weeks': r'(\d+)\s*weeks?'}
+    for period, pattern in time_patterns.items():
+        matches = re.findall(pattern, user_input.lower())
+        if matches:
+            context[period] = [int(m) for m in matches]
+    financial_keywords = {
+        'debt_types': ['student loan', 'credit card', 'mortgage', 'car loan', 'personal loan'],
+        'investment_types': ['stocks', 'bonds', '401k', 'ira', 'roth', 'mutual fund', 'etf'],
+        'account_types': ['checking', 'savings', 'high-yield', 'money market'],
+        'goals': ['retirement', 'house', 'car', 'vacation', 'wedding', 'education'],
+        'life_stage': ['student', 'graduate', 'married', 'single', 'parent', 'retired']
+    }
+    for category, keywords in financial_keywords.items():
+        found = [kw for kw in keywords if kw in user_input.lower()]
+        if found:
+            context[category] = found
+    return context
+
+
+def _time(extract, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            extract(message)
+    return (time.perf_counter() - t0) / (iterations * len(MESSAGES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    print("🔎 Financial Entity Extraction Benchmark")
+    print("=" * 60)
+    legacy = _time(legacy_extract_financial_context, args.iterations)
+    compiled = _time(extract_financial_context, args.iterations)
+    print(f"{'legacy':>10}: {legacy * 1e6:8.1f} µs/message")
+    print(f"{'compiled':>10}: {compiled * 1e6:8.1f} µs/message  ({legacy / compiled:.1f}x)")
+    print()
+    for message in MESSAGES[:3]:
+        print(f"   {message[:60]}...")
+        print(f"      {extract_financial_context(message)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark Granite CPU inference precision modes (fp32 / bf16 / int8)
+
+Each mode is measured in its own subprocess so memory numbers are not
+polluted by previously loaded models. Outputs use greedy decoding so the
+quality comparison against fp32 is deterministic.
+
+Usage:
+    python benchmark_precision.py                 # all modes
+    python benchmark_precision.py --modes fp32 int8 --runs 5
+"""
+
+import argparse
+import difflib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Add backend to path, ahead of the Streamlit app.py that would shadow the app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+PROMPTS = [
+    ("How do I build an emergency fund?", "student"),
+    ("Should I pay off my credit card or invest first?", "professional"),
+    ("How much of my paycheck should go to rent?", "student"),
+]
+
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux), else peak RSS."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, runs: int) -> dict:
+    """Load the model in one precision mode and time greedy generation."""
+    os.environ["MODEL_PRECISION"] = mode
+    import torch
+    from app import service
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    if not service._load_model():
+        return {"mode": mode, "error": service.model_status.get("error") or "model failed to load"}
+    load_seconds = time.perf_counter() - started
+
+    buffer = io.BytesIO()
+    torch.save(service._model.state_dict(), buffer)
+
+    prompts = [service._build_prompt(q, m, "") for q, m in PROMPTS]
+    service._generate_with_granite_batch(prompts[:1], max_new_tokens=4, do_sample=False)  # warm-up
+
+    latencies = []
+    outputs = []
+    new_tokens = 0
+    for _ in range(runs):
+        for prompt in prompts:
+            t0 = time.perf_counter()
+            text = service._generate_with_granite_batch([prompt], do_sample=False)[0]
+            latencies.append(time.perf_counter() - t0)
+            new_tokens += len(service._tokenizer(text)["input_ids"])
+            outputs.append(text)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "precision": service.model_status.get("precision"),
+        "load_seconds": round(load_seconds, 2),
+        "model_size_mb": round(buffer.getbuffer().nbytes / 1024 / 1024, 1),
+        "rss_delta_mb": round(_rss_mb() - rss_before, 1),
+        "latency_p50_s": round(latencies[len(latencies) // 2], 3),
+        "latency_max_s": round(latencies[-1], 3),
+        "tokens_per_s": round(new_tokens / sum(latencies), 2),
+        "outputs": outputs[:len(prompts)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["fp32", "bf16", "int8"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.runs)))
+        return
+
+    print("⚡ Granite Precision Benchmark")
+    print("=" * 60)
+    results = {}
+    for mode in args.modes:
+        print(f"🔄 Measuring {mode}...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--runs", str(args.runs)],
+            capture_output=True,
+            text=True,
+        )
+        try:
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            results[mode] = {"mode": mode, "error": proc.stderr.strip()[-500:] or "no output"}
+
+    baseline = results.get("fp32", {}).get("outputs")
+    print()
+    print(f"{'mode':<6} {'load s':>8} {'size MB':>8} {'RSS MB':>8} {'p50 s':>7} {'tok/s':>7} {'vs fp32':>8}")
+    for mode, r in results.items():
+        if "error" in r:
+            print(f"{mode:<6} ❌ {r['error']}")
+            continue
+        similarity = ""
+        if baseline and mode != "fp32":
+            ratios = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(baseline, r["outputs"])]
+            similarity = f"{sum(ratios) / len(ratios):.2f}"
+        print(
+            f"{mode:<6} {r['load_seconds']:>8} {r['model_size_mb']:>8} {r['rss_delta_mb']:>8} "
+            f"{r['latency_p50_s']:>7} {r['tokens_per_s']:>7} {similarity:>8}"
+        )
+
+    print()
+    print("'vs fp32' is the mean character-level similarity of greedy outputs to fp32 (1.00 = identical).")
+
+
+if __name__ == "__main__":
+    main()
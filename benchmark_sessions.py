@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark session storage backends at scale
+
+Pre-populates each backend with --sessions sessions, then measures create and
+update throughput plus get latency. The original JSON store reloads and
+rewrites the whole file per operation, so it is only given --legacy-ops
+operations; the others run --ops each.
+
+Usage:
+    python benchmark_sessions.py
+    python benchmark_sessions.py --sessions 20000 --ops 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add backend to path, ahead of the Streamlit app.py that would shadow the app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from app.storage import JSONSessionStore, WriteBehindJSONSessionStore, SQLiteSessionStore
+
+
+def _seed_json(path: str, count: int) -> list:
+    sessions = [
+        {
+            "id": f"s{i:07d}",
+            "title": f"Session {i+1}",
+            "created_at": "2024-01-01T00:00:00Z",
+            "messages": [{"role": "user", "content": "How do I budget?"}, {"role": "assistant", "content": "Track spending."}],
+        }
+        for i in range(count)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"sessions": sessions}, f)
+    return [s["id"] for s in sessions]
+
+
+def _measure(store, ids: list, ops: int) -> dict:
+    message = [{"role": "user", "content": "What about an emergency fund?"}]
+
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        store.create_session()
+    create = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        sid = random.choice(ids)
+        store.update_session_messages(sid, store.get_session(sid)["messages"] + message)
+    update = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        store.get_session(random.choice(ids))
+    get = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store.flush()
+    flush = time.perf_counter() - t0
+
+    return {
+        "ops": ops,
+        "create_per_s": round(ops / create),
+        "update_per_s": round(ops / update),
+        "get_ms": round(get / ops * 1000, 3),
+        "final_flush_s": round(flush, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--legacy-ops", type=int, default=50)
+    args = parser.parse_args()
+
+    print("🗄️  Session Storage Benchmark")
+    print("=" * 60)
+    print(f"Pre-populated sessions: {args.sessions}")
+    workdir = tempfile.mkdtemp(prefix="sessions-bench-")
+    results = {}
+    try:
+        seed = os.path.join(workdir, "seed.json")
+        ids = _seed_json(seed, args.sessions)
+
+        path = os.path.join(workdir, "legacy.json")
+        shutil.copy(seed, path)
+        print("🔄 json (original load/save per operation)...")
+        results["json (original)"] = _measure(JSONSessionStore(path), ids, args.legacy_ops)
+
+        path = os.path.join(workdir, "writebehind.json")
+        shutil.copy(seed, path)
+        print("🔄 json (write-behind)...")
+        store = WriteBehindJSONSessionStore(path)
+        results["json (write-behind)"] = _measure(store, ids, args.ops)
+        results["json (write-behind)"]["snapshot_flushes"] = store.stats["flushes"]
+        store.close()
+
+        path = os.path.join(workdir, "sessions.db")
+        print("🔄 sqlite...")
+        store = SQLiteSessionStore(path)
+        store.import_sessions(JSONSessionStore(seed).list_sessions())
+        results["sqlite"] = _measure(store, ids, args.ops)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(f"{'backend':<22} {'ops':>6} {'create/s':>10} {'update/s':>10} {'get ms':>8} {'flush s':>8}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['ops']:>6} {r['create_per_s']:>10} {r['update_per_s']:>10} {r['get_ms']:>8} {r['final_flush_s']:>8}")
+
+
+if __name__ == "__main__":
+    main()
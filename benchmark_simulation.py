@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Monte Carlo investment simulation
+
+Runs /api/invest/simulate's engine in-process for increasing path counts,
+then once sharded over a process pool, and checks that a seeded sharded run
+reproduces the in-process result exactly.
+
+Usage:
+    python benchmark_simulation.py
+    python benchmark_simulation.py --years 40 --paths 10000 100000 400000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add backend to path, ahead of the Streamlit app.py that would shadow the app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from app.simulation import SimulationInput, simulate
+
+
+def _input(paths: int, years: int) -> SimulationInput:
+    return SimulationInput(
+        initial_investment=10000,
+        monthly_investment=500,
+        annual_return_pct=7,
+        annual_volatility_pct=15,
+        years=years,
+        paths=paths,
+        seed=42,
+        target_amount=1_000_000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=40)
+    parser.add_argument("--paths", type=int, nargs="+", default=[10000, 100000, 400000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print("🎲 Monte Carlo Simulation Benchmark")
+    print("=" * 60)
+    print(f"Horizon: {args.years} years ({args.years * 12} months)")
+    print()
+    print(f"{'paths':>9} {'workers':>8} {'seconds':>8} {'paths/s':>10} {'p50 final':>14} {'P(target)':>10}")
+
+    for paths in args.paths:
+        data = _input(paths, args.years)
+        for workers in ([1, args.workers] if args.workers > 1 else [1]):
+            t0 = time.perf_counter()
+            result = simulate(data, workers=workers) if workers == 1 else _sharded(data, workers)
+            elapsed = time.perf_counter() - t0
+            print(
+                f"{paths:>9} {workers:>8} {elapsed:>8.2f} {paths / elapsed:>10.0f} "
+                f"{result.percentile_bands['p50'][-1]:>14,.0f} {result.probability_of_target:>10.3f}"
+            )
+            if workers == 1:
+                baseline = result
+            elif result.percentile_bands != baseline.percentile_bands:
+                print("   ❌ sharded result differs from in-process result")
+
+
+def _sharded(data: SimulationInput, workers: int):
+    from app import simulation
+    simulation.SIMULATION_PARALLEL_MIN_PATHS = 1
+    return simulate(data, workers=workers)
+
+
+if __name__ == "__main__":
+    main()
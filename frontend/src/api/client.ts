@@ -45,12 +45,14 @@ export interface ChatRequest {
   user_input: string
   scenario_context?: string
   user_mode?: string
+  bypass_cache?: boolean
 }
 
 export interface ChatResponse {
   response: string
   provider: string
   used_fallback: boolean
+  cached?: boolean
 }
 
 export interface FraudDetectionRequest {
@@ -67,10 +69,57 @@ export interface FraudDetectionResponse {
   analysis_type?: string
 }
 
+// Parses the server-sent events from /api/chat/stream, calling onToken for each chunk
+async function streamChat(data: ChatRequest, onToken: (token: string) => void): Promise<ChatResponse> {
+  const res = await fetch(`${API_BASE}/api/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+  })
+  if (!res.ok || !res.body) {
+    throw new Error(`Streaming request failed with status ${res.status}`)
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let text = ''
+  let meta = { provider: 'unknown', used_fallback: false }
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      let payload = ''
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) payload += line.slice(5).trim()
+      }
+      if (!payload) continue
+      const parsed = JSON.parse(payload)
+      if (event === 'done') meta = parsed
+      else if (event === 'error') throw new Error(parsed.detail)
+      else {
+        text += parsed.token
+        onToken(parsed.token)
+      }
+    }
+  }
+
+  return { response: text, ...meta }
+}
+
 // API functions
 export const chatAPI = {
   sendMessage: (data: ChatRequest): Promise<ChatResponse> =>
     api.post('/api/chat', data).then(res => res.data),
+
+  streamMessage: streamChat,
 }
 
 export const fraudAPI = {
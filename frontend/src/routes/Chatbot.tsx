@@ -1,6 +1,6 @@
 import { useMemo, useRef, useState, useEffect } from 'react'
 import { useMutation } from '@tanstack/react-query'
-import { api } from '../api/client'
+import { chatAPI } from '../api/client'
 import Button from '../components/Button'
 import Card from '../components/Card'
 
@@ -23,25 +23,40 @@ export default function Chatbot() {
   const [input, setInput] = useState('')
   const [mode, setMode] = useState<'student' | 'professional'>('professional')
   const [mountAnim, setMountAnim] = useState(false)
+  const [streaming, setStreaming] = useState(false)
   const scrollRef = useRef<HTMLDivElement>(null)
 
   useEffect(() => { const t = setTimeout(()=>setMountAnim(true), 10); return () => clearTimeout(t) }, [])
 
   const chatMutation = useMutation({
     mutationFn: async (payload: { user_input: string, user_mode: string, scenario_context?: string }) => {
-      const { data } = await api.post('/api/chat', payload)
-      return data as { response: string, provider?: string, used_fallback?: boolean }
+      let started = false
+      const data = await chatAPI.streamMessage(payload, (token) => {
+        if (!started) {
+          started = true
+          setStreaming(true)
+          setMessages(prev => [...prev, { role: 'assistant', content: token }])
+        } else {
+          setMessages(prev => {
+            const last = prev[prev.length - 1]
+            return [...prev.slice(0, -1), { ...last, content: last.content + token }]
+          })
+        }
+        scrollRef.current?.scrollIntoView({ behavior: 'smooth' })
+      })
+      return { ...data, streamed: started }
     },
     onSuccess: (data) => {
-      setMessages(prev => [...prev, {
-        role: 'assistant',
-        content: data.response,
-        provider: data.provider
-      }])
+      setStreaming(false)
+      setMessages(prev => {
+        const message: Message = { role: 'assistant', content: data.response, provider: data.provider }
+        return data.streamed ? [...prev.slice(0, -1), message] : [...prev, message]
+      })
       setTimeout(() => scrollRef.current?.scrollIntoView({ behavior: 'smooth' }), 10)
     },
     onError: (error: any) => {
       console.error('Chat API Error:', error)
+      setStreaming(false)
       setMessages(prev => [...prev, {
         role: 'assistant',
         content: 'Sorry, I encountered an error while processing your request. Please try again.',
@@ -158,7 +173,7 @@ export default function Chatbot() {
             </div>
           </div>
         ))}
-        {chatMutation.isPending && (
+        {chatMutation.isPending && !streaming && (
           <div className="flex justify-start animate-fade-up">
             <div className="max-w-[75%] px-4 py-3 rounded-2xl bg-blue-50 border border-blue-200 rounded-bl-sm">
               <div className="flex items-center gap-3">
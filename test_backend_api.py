@@ -5,10 +5,211 @@ Test script to verify the backend API is working properly
 
 import requests
 import json
+import struct
+import sys
 import time
 
+def check(failures, label, ok):
+    """Print one check and record it if it failed"""
+    print(f"  {'✓' if ok else '✗'} {label}")
+    if not ok:
+        failures.append(label)
+    return ok
+
+def read_sse(response):
+    """Split a text/event-stream body into (event, data) pairs"""
+    events, name, data = [], "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            field, _, value = line.partition(":")
+            if field == "event":
+                name = value.strip()
+            elif field == "data":
+                data.append(value[1:] if value.startswith(" ") else value)
+        elif data:
+            events.append((name, "\n".join(data)))
+            name, data = "message", []
+    if data:
+        events.append((name, "\n".join(data)))
+    return events
+
+def stream_chat(base_url, payload):
+    """POST /api/chat/stream; returns (content type, events)"""
+    with requests.post(f"{base_url}/api/chat/stream", json=payload, stream=True, timeout=600) as response:
+        response.raise_for_status()
+        return response.headers.get("content-type", ""), read_sse(response)
+
+def test_chat_stream(base_url, failures):
+    print("\n5. Testing chat streaming endpoint...")
+    payload = {
+        "user_input": "Give me one tip for building an emergency fund.",
+        "user_mode": "student",
+        "scenario_context": ""
+    }
+    try:
+        content_type, events = stream_chat(base_url, payload)
+    except requests.exceptions.RequestException as e:
+        check(failures, f"Stream request failed: {e}", False)
+        return
+
+    check(failures, f"Content type is text/event-stream ({content_type})", content_type.startswith("text/event-stream"))
+    check(failures, f"Received {len(events)} events", len(events) >= 2)
+    if not events:
+        return
+    tokens, done = events[:-1], events[-1]
+    check(failures, "Every event before the last is a data-only token event",
+          all(name == "message" and isinstance(json.loads(data).get("token"), str) for name, data in tokens))
+    text = "".join(json.loads(data)["token"] for _, data in tokens)
+    check(failures, f"Tokens add up to a response ({len(text)} chars)", bool(text.strip()))
+    check(failures, f"Stream ends with a done event (got '{done[0]}')", done[0] == "done")
+    if done[0] != "done":
+        print(f"    Last event: {done[1][:200]}")
+        return
+    meta = json.loads(done[1])
+    check(failures, f"Done event carries provider/used_fallback/cached: {meta}",
+          {"provider", "used_fallback", "cached"} <= set(meta))
+    check(failures, "Exactly one done event", sum(1 for name, _ in events if name == "done") == 1)
+
+    # A complete model answer is cached, so the same request replays it
+    cache = requests.get(f"{base_url}/api/chat/cache/stats", timeout=10).json()
+    if meta.get("used_fallback") or not cache.get("max_entries"):
+        print("  - Replay check skipped (fallback answer or chat cache disabled)")
+        return
+    _, replay = stream_chat(base_url, payload)
+    replay_meta = json.loads(replay[-1][1]) if replay and replay[-1][0] == "done" else {}
+    check(failures, "Repeated request is served from the cache", replay_meta.get("cached") is True)
+    check(failures, "Cached replay streams the same text",
+          "".join(json.loads(data)["token"] for name, data in replay[:-1] if name == "message") == text)
+
+def test_session_messages(base_url, failures):
+    print("\n6. Testing session message append and paging...")
+    try:
+        sid = requests.post(f"{base_url}/api/sessions", json={"title": "paging test"}, timeout=10).json()["id"]
+        sent = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(7)]
+        counts = [
+            requests.post(f"{base_url}/api/sessions/{sid}/messages", json={"messages": batch}, timeout=10).json()["message_count"]
+            for batch in (sent[:3], sent[3:])
+        ]
+        check(failures, f"Appends report running message counts {counts}", counts == [3, 7])
+
+        def page(**params):
+            response = requests.get(f"{base_url}/api/sessions/{sid}/messages", params={"limit": 3, **params}, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return [m["position"] for m in data["messages"]], data["next_cursor"], data["prev_cursor"], data["messages"]
+
+        positions, next_cursor, prev_cursor, messages = page()
+        check(failures, f"First page is positions {positions}, next={next_cursor}, prev={prev_cursor}",
+              (positions, next_cursor, prev_cursor) == ([0, 1, 2], 2, None))
+        check(failures, "Messages come back as sent",
+              [{"role": m["role"], "content": m["content"]} for m in messages] == sent[:3])
+        positions, next_cursor, prev_cursor, _ = page(after=2)
+        check(failures, f"after=2 gives positions {positions}, next={next_cursor}, prev={prev_cursor}",
+              (positions, next_cursor, prev_cursor) == ([3, 4, 5], 5, 3))
+        positions, next_cursor, _, _ = page(after=5)
+        check(failures, f"after=5 gives the last message {positions} and no next cursor", (positions, next_cursor) == ([6], None))
+        positions, _, prev_cursor, _ = page(before=7)
+        check(failures, f"before=7 gives positions {positions}, prev={prev_cursor}", (positions, prev_cursor) == ([4, 5, 6], 4))
+        positions, _, prev_cursor, _ = page(before=2)
+        check(failures, f"before=2 gives positions {positions} and no prev cursor", (positions, prev_cursor) == ([0, 1], None))
+
+        session = requests.get(f"{base_url}/api/sessions/{sid}", timeout=10).json()
+        check(failures, "Full session holds all appended messages", len(session["messages"]) == 7)
+        missing = requests.post(f"{base_url}/api/sessions/no-such-session/messages", json={"messages": sent[:1]}, timeout=10)
+        check(failures, f"Appending to an unknown session returns 404 (got {missing.status_code})", missing.status_code == 404)
+        missing = requests.get(f"{base_url}/api/sessions/no-such-session/messages", timeout=10)
+        check(failures, f"Paging an unknown session returns 404 (got {missing.status_code})", missing.status_code == 404)
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        check(failures, f"Session messages error: {e}", False)
+
+def test_invest_simulation(base_url, failures):
+    print("\n7. Testing Monte Carlo investment simulation...")
+    payload = {
+        "initial_investment": 1000,
+        "monthly_investment": 300,
+        "annual_return_pct": 7,
+        "annual_volatility_pct": 15,
+        "years": 20,
+        "paths": 5000,
+        "seed": 42,
+        "target_amount": 150000
+    }
+    try:
+        runs = [requests.post(f"{base_url}/api/invest/simulate", json=payload, timeout=60).json() for _ in range(2)]
+        steady = requests.post(f"{base_url}/api/invest/simulate", json={
+            **payload, "monthly_investment": 0, "annual_volatility_pct": 0, "years": 10, "target_amount": None
+        }, timeout=60).json()
+        invalid = requests.post(f"{base_url}/api/invest/simulate", json={**payload, "years": 0}, timeout=60)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        check(failures, f"Simulation error: {e}", False)
+        return
+
+    data = runs[0]
+    bands = list(data["percentile_bands"].values())
+    print(f"  Median after 20 years: ${bands[len(bands) // 2][-1]:,.2f}, P(>= $150k) = {data['probability_of_target']}")
+    check(failures, "Same seed gives the same result",
+          (runs[0]["percentile_bands"], runs[0]["final_mean"]) == (runs[1]["percentile_bands"], runs[1]["final_mean"]))
+    check(failures, f"{len(bands)} bands of {payload['years'] + 1} yearly points starting at the initial investment",
+          len(bands) == 5 and all(len(b) == payload["years"] + 1 and b[0] == payload["initial_investment"] for b in bands))
+    check(failures, "Bands are ordered by percentile every year",
+          all(lo <= hi for low, high in zip(bands, bands[1:]) for lo, hi in zip(low, high)))
+    check(failures, f"Total invested is ${data['total_invested']:,.2f}", data["total_invested"] == 1000 + 300 * 12 * 20)
+    check(failures, "Probability of reaching the target is between 0 and 1", 0 <= data["probability_of_target"] <= 1)
+    expected = [1000 * 1.07 ** year for year in range(11)]
+    check(failures, "Zero volatility compounds at exactly the expected return",
+          all(abs(value - want) < 0.05 for band in steady["percentile_bands"].values() for value, want in zip(band, expected)))
+    check(failures, f"years=0 is rejected with 422 (got {invalid.status_code})", invalid.status_code == 422)
+
+def test_projections(base_url, failures):
+    print("\n8. Testing projection series endpoints...")
+    savings = {"current_amount": 1000, "monthly_contribution": 200, "target_amount": 3000, "months": 24}
+    investment = {"initial_investment": 1000, "monthly_investment": 300, "annual_return_pct": 7, "months": 120}
+    debt = {"balance": 5000, "annual_interest_pct": 12, "monthly_payment": 500, "months": 360, "max_points": 50}
+    try:
+        post = lambda kind, payload, **params: requests.post(f"{base_url}/api/projection/{kind}", json=payload, params=params, timeout=10)
+        s = post("savings", savings).json()
+        inv = post("investment", investment).json()
+        calc = requests.post(f"{base_url}/api/invest/calc", json={
+            "initial_investment": 1000, "monthly_investment": 300, "annual_return_pct": 7, "years": 10
+        }, timeout=10).json()
+        d = post("debt", debt).json()
+        binary = {fmt: post("debt", debt, format=fmt) for fmt in ("f32", "f64")}
+        invalid = [post("savings", {**savings, "months": 0}).status_code, post("savings", savings, format="xml").status_code]
+    except (requests.exceptions.RequestException, ValueError) as e:
+        check(failures, f"Projection error: {e}", False)
+        return
+
+    cols = s["columns"]
+    check(failures, f"Savings: {len(cols['month'])} monthly rows, goal reached in month {s['event_month']}",
+          cols["month"] == list(range(25)) and s["event_month"] == 10)
+    check(failures, "Savings: balance is capped at the target and contributions stop there",
+          max(cols["balance"]) == 3000 and s["total_contributed"] == 2000)
+    final = inv["columns"]["balance"][-1]
+    check(failures, f"Investment: month 120 balance ${final:,.2f} matches /api/invest/calc",
+          abs(final - calc["total_future_value"]) < 0.01)
+    cols = d["columns"]
+    check(failures, f"Debt: downsampled to {len(cols['month'])} points keeping months 0, {d['event_month']} and 360",
+          len(cols["month"]) <= 51 and {0, d["event_month"], 360} <= set(cols["month"]))
+    check(failures, "Debt: balance never rises and ends at zero",
+          all(a >= b for a, b in zip(cols["balance"], cols["balance"][1:])) and cols["balance"][-1] == 0)
+
+    for fmt, size, code in (("f32", 4, "f"), ("f64", 8, "d")):
+        response = binary[fmt]
+        meta = json.loads(response.headers.get("X-Projection-Meta", "{}"))
+        rows = meta.get("rows", 0)
+        check(failures, f"{fmt}: octet-stream with {rows} rows x {len(meta.get('columns', []))} columns in X-Projection-Meta",
+              response.headers.get("content-type") == "application/octet-stream"
+              and meta.get("columns") == list(cols) and len(response.content) == rows * len(cols) * size)
+        values = struct.unpack(f"<{rows * len(cols)}{code}", response.content) if len(response.content) == rows * len(cols) * size else ()
+        decoded = {name: values[i * rows:(i + 1) * rows] for i, name in enumerate(meta.get("columns", []))}
+        tolerance = 0.01 if fmt == "f32" else 0
+        check(failures, f"{fmt}: columns decode to the JSON values",
+              bool(values) and all(abs(a - b) <= tolerance for name in cols for a, b in zip(decoded[name], cols[name])))
+    check(failures, f"months=0 and format=xml are rejected with 422 (got {invalid})", invalid == [422, 422])
+
 def test_backend_api():
     base_url = "http://127.0.0.1:8000"
+    failures = []
     
     print("Testing Backend API")
     print("=" * 50)
@@ -110,9 +311,17 @@ def test_backend_api():
     except requests.exceptions.RequestException as e:
         print(f"  ✗ Investment calculation error: {e}")
     
+    test_chat_stream(base_url, failures)
+    test_session_messages(base_url, failures)
+    test_invest_simulation(base_url, failures)
+    test_projections(base_url, failures)
+    
     print("\n" + "=" * 50)
+    if failures:
+        print(f"Backend API test completed with {len(failures)} failed check(s)")
+        return False
     print("Backend API test completed!")
     return True
 
 if __name__ == "__main__":
-    test_backend_api()
+    sys.exit(0 if test_backend_api() else 1)
@@ -5,11 +5,119 @@ Test the fraud detection API endpoints
 
 import requests
 import json
+import sys
 from datetime import datetime
 
+SCAM_TEXT = "URGENT: your account is suspended. Verify your password at http://secure-login.example within 24 hours or it will be closed."
+BENIGN_TEXT = "Reminder: your dentist appointment is on Thursday at 3pm. Reply C to confirm."
+
+def check(failures, label, ok):
+    """Print one check and record it if it failed"""
+    print(f"   {'✅' if ok else '❌'} {label}")
+    if not ok:
+        failures.append(label)
+    return ok
+
+def cache_misses(base_url):
+    return requests.get(f"{base_url}/api/fraud/stats", timeout=10).json()["cache"]["misses"]
+
+def test_fraud_batch(base_url, failures):
+    """Batch endpoint: input order, echoed ids, duplicates analyzed once"""
+    print("🧪 Testing: Batch detection")
+    items = [
+        {"id": "a", "content": SCAM_TEXT},
+        {"id": "b", "content": BENIGN_TEXT},
+        {"id": "c", "content": SCAM_TEXT},
+        {"content": SCAM_TEXT, "analysis_type": "financial"},
+        {"id": "e", "content": BENIGN_TEXT},
+    ]
+    try:
+        requests.delete(f"{base_url}/api/fraud/cache", timeout=10)
+        misses = cache_misses(base_url)
+        response = requests.post(f"{base_url}/api/fraud/detect/batch", json={"items": items}, timeout=120)
+        response.raise_for_status()
+        data = response.json()
+        misses = cache_misses(base_url) - misses
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        check(failures, f"Batch request failed: {e}", False)
+        return
+
+    results = data["results"]
+    check(failures, f"total={data['total']} unique={data['unique']}", (data["total"], data["unique"]) == (5, 3))
+    check(failures, "Results come back in input order with ids echoed",
+          [(r["index"], r["id"]) for r in results] == [(i, item.get("id")) for i, item in enumerate(items)])
+    check(failures, f"Only the {data['unique']} unique texts were analyzed ({misses} cache lookups)", misses == data["unique"])
+    verdict = lambda r: (r["detected_content"], r["awareness_message"], r["provider"], r["success"])
+    check(failures, "Duplicate texts share one verdict",
+          verdict(results[0]) == verdict(results[2]) and verdict(results[1]) == verdict(results[4]))
+    check(failures, "Analysis type is kept per item",
+          [r["analysis_type"] for r in results] == ["general", "general", "general", "financial", "general"])
+    check(failures, f"succeeded={data['succeeded']} failed={data['failed']} add up to total",
+          data["succeeded"] + data["failed"] == data["total"]
+          and data["succeeded"] == sum(r["success"] for r in results))
+    print()
+
+def scan(base_url, document):
+    response = requests.post(f"{base_url}/api/fraud/scan", data=document.encode("utf-8"),
+                             headers={"Content-Type": "text/plain; charset=utf-8"}, timeout=300)
+    response.raise_for_status()
+    return response.json()
+
+def check_findings(failures, data, document):
+    findings = data["findings"]
+    spans = [(f["start"], f["end"]) for f in findings]
+    check(failures, f"{len(findings)} finding(s) with offsets inside the document",
+          all(0 <= start < end <= len(document) for start, end in spans))
+    check(failures, "Findings are sorted and do not overlap",
+          all(prev[1] < cur[0] for prev, cur in zip(spans, spans[1:])))
+
+def test_fraud_scan(base_url, failures):
+    """Scan endpoint: character offsets, full coverage, early stop on a scam"""
+    print("🧪 Testing: Document scan")
+    # Multi-byte characters first, so byte offsets would differ from character offsets
+    intro = "Café ☕ notes — résumé and budget for next month.\n"
+    filler = "".join(f"Line {i}: lunch with the team, then groceries and the gym before dinner.\n" for i in range(4000))
+    try:
+        benign = scan(base_url, intro + filler[:40000])
+        # An exported inbox that opens with a run of phishing mails longer than one chunk
+        scam_doc = intro + (SCAM_TEXT + "\n") * 60 + filler
+        scam = scan(base_url, scam_doc)
+        # The same phishing run planted between two stretches of ordinary notes
+        planted = (SCAM_TEXT + "\n") * 60
+        planted_start = len(intro) + 20000
+        planted_doc = intro + filler[:20000] + planted + filler[20000:40000]
+        middle = scan(base_url, planted_doc)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        check(failures, f"Scan request failed: {e}", False)
+        return
+
+    print(f"   Benign document: {benign['chunks_scanned']} chunks, {benign['chars_scanned']} chars")
+    check(failures, "Benign document is scanned to the end without stopping early",
+          benign["chars_scanned"] == len(intro) + 40000 and not benign["stopped_early"])
+    check(failures, "Benign document is split into several chunks", benign["chunks_scanned"] > 1)
+    check(failures, f"No failed chunks ({benign['failed_chunks']})", benign["failed_chunks"] == 0)
+    check(failures, f"Benign document has no findings ({len(benign['findings'])})", benign["findings"] == [])
+    check(failures, f"Benign document reports no scam ('{benign['detected_content'][:60]}')", benign["detected_content"] == "None")
+
+    print(f"   Scam document: {scam['chunks_scanned']} chunks, {scam['chars_scanned']} of {len(scam_doc)} chars")
+    check(failures, "Scan stops early after the scam", scam["stopped_early"] and scam["chars_scanned"] < len(scam_doc))
+    check_findings(failures, scam, scam_doc)
+    check(failures, "A finding's offsets cover the scam text",
+          any(SCAM_TEXT in scam_doc[f["start"]:f["end"]] for f in scam["findings"]))
+
+    spans = [(f["start"], f["end"]) for f in middle["findings"]]
+    print(f"   Planted scam at {planted_start}-{planted_start + len(planted)}: findings {spans}")
+    check_findings(failures, middle, planted_doc)
+    check(failures, "Every finding overlaps the planted text",
+          all(start < planted_start + len(planted) and end > planted_start for start, end in spans))
+    check(failures, "A finding's offsets cover the planted scam text",
+          any(SCAM_TEXT in planted_doc[start:end] for start, end in spans))
+    print()
+
 def test_fraud_api():
     """Test the fraud detection API endpoints"""
     base_url = "http://127.0.0.1:8000"
+    failures = []
     
     print("🔒 Testing FraudAwarenessGPT API")
     print("=" * 60)
@@ -24,10 +132,10 @@ def test_fraud_api():
             print("   ✅ Backend is healthy")
         else:
             print(f"   ❌ Health check failed: {response.status_code}")
-            return
+            return False
     except Exception as e:
         print(f"   ❌ Cannot connect to backend: {e}")
-        return
+        return False
     
     print()
     
@@ -90,9 +198,16 @@ def test_fraud_api():
         
         print()
     
+    test_fraud_batch(base_url, failures)
+    test_fraud_scan(base_url, failures)
+    
     print("=" * 60)
     print(f"📅 Finished: {datetime.now().strftime('%H:%M:%S')}")
+    if failures:
+        print(f"❌ Fraud detection API test completed with {len(failures)} failed check(s)")
+        return False
     print("🎉 Fraud detection API test completed!")
+    return True
 
 if __name__ == "__main__":
-    test_fraud_api()
+    sys.exit(0 if test_fraud_api() else 1)
@@ -11,6 +11,35 @@ from datetime import datetime
 # Add backend to path
 sys.path.append('backend')
 
+def test_prefix_cache():
+    """Two prompts of the same mode must hit the preamble cache and pass its past_key_values to generate"""
+    from app import service
+    print("🧪 Testing prompt prefix cache...")
+    if not service._prefix_cache:
+        print("❌ Prefix cache is empty (PROMPT_PREFIX_CACHE=0 or priming failed)")
+        return False
+
+    reused = []
+    generate = service._model.generate
+
+    def recording_generate(*args, **kwargs):
+        reused.append(kwargs.get("past_key_values") is not None)
+        return generate(*args, **kwargs)
+
+    hits = service.prefix_cache_stats["hits"]
+    service._model.generate = recording_generate
+    try:
+        for question in ("How do I start budgeting?", "Should I open a credit card?"):
+            service._generate_with_granite(service._build_prompt(question, "student", ""))
+    finally:
+        del service._model.generate
+    hits = service.prefix_cache_stats["hits"] - hits
+
+    ok = hits == 2 and reused == [True, True]
+    print(f"{'✅' if ok else '❌'} Prefix cache hits: {hits}/2, past_key_values reused: {reused}")
+    print()
+    return ok
+
 def test_model_loading():
     """Test loading and using the Granite AI model"""
     print("🤖 Granite AI Model Loading Test")
@@ -40,6 +69,8 @@ def test_model_loading():
             print(f"✅ Model loaded successfully in {load_time:.2f} seconds!")
             print()
             
+            test_prefix_cache()
+            
             # Test different types of financial questions
             test_questions = [
                 {